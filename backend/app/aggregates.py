@@ -0,0 +1,118 @@
+# backend/app/aggregates.py
+# File path: backend/app/aggregates.py
+"""Incremental activity rollups.
+
+After ``alembic upgrade head``, run ``python -m app.aggregates backfill``
+once to populate activity_daily from the existing activities table;
+afterwards the write paths keep it current.
+"""
+import sys
+from datetime import date, timedelta
+
+from sqlalchemy import Integer, Select, cast, func, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import ActivityDaily
+
+# Rough estimate: ~5-7 cal/min for moderate activity
+CALORIES_PER_MINUTE = 6
+
+
+async def add_to_daily_rollup(db: AsyncSession, rows: list[tuple[int, date, int, int]]):
+    """Fold (owner_id, day, minutes, count) deltas into activity_daily.
+
+    Runs inside the caller's transaction so the rollup commits with the
+    activities it describes.
+    """
+    if not rows:
+        return
+    stmt = pg_insert(ActivityDaily).values([
+        {"owner_id": owner_id, "day": day, "total_minutes": minutes, "activity_count": count}
+        for owner_id, day, minutes, count in rows
+    ])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ActivityDaily.owner_id, ActivityDaily.day],
+        set_={
+            "total_minutes": ActivityDaily.total_minutes + stmt.excluded.total_minutes,
+            "activity_count": ActivityDaily.activity_count + stmt.excluded.activity_count,
+        },
+    )
+    await db.execute(stmt)
+
+
+def weekly_totals_query(owner_id: int, today: date) -> Select:
+    """Columns total_minutes, activity_count over the last 7 calendar days including today"""
+    return select(
+        func.coalesce(func.sum(ActivityDaily.total_minutes), 0).label("total_minutes"),
+        func.coalesce(func.sum(ActivityDaily.activity_count), 0).label("activity_count"),
+    ).where(
+        ActivityDaily.owner_id == owner_id,
+        ActivityDaily.day > today - timedelta(days=7),
+        ActivityDaily.day <= today,
+    )
+
+
+async def weekly_totals(db: AsyncSession, owner_id: int, today: date) -> tuple[int, int]:
+    """(minutes, activities) over the last 7 calendar days including today"""
+    result = await db.execute(weekly_totals_query(owner_id, today))
+    minutes, count = result.one()
+    return int(minutes), int(count)
+
+
+def current_streak_query(owner_id: int, today: date) -> Select:
+    """Activities logged in the unbroken run of days ending today or yesterday.
+
+    Gaps-and-islands: on consecutive days (walking backwards), day + row_number
+    stays constant, so the newest island is every row sharing the newest grp.
+    """
+    rank = func.row_number().over(order_by=ActivityDaily.day.desc())
+    days = (
+        select(
+            ActivityDaily.day,
+            ActivityDaily.activity_count,
+            # row_number() is bigint and Postgres only defines date + integer
+            (ActivityDaily.day + cast(rank, Integer)).label("grp"),
+        )
+        .where(ActivityDaily.owner_id == owner_id, ActivityDaily.day <= today)
+        .cte("days")
+    )
+    latest = select(days.c.day, days.c.grp).order_by(days.c.day.desc()).limit(1).cte("latest")
+    return (
+        select(func.coalesce(func.sum(days.c.activity_count), 0))
+        .select_from(days.join(latest, days.c.grp == latest.c.grp))
+        .where(latest.c.day >= today - timedelta(days=1))
+    )
+
+
+async def current_streak(db: AsyncSession, owner_id: int, today: date) -> int:
+    """Activities in the current streak; see current_streak_query"""
+    result = await db.execute(current_streak_query(owner_id, today))
+    return int(result.scalar_one())
+
+
+BACKFILL_SQL = """
+INSERT INTO activity_daily (owner_id, day, total_minutes, activity_count)
+SELECT owner_id, CAST(date AS DATE), SUM(duration), COUNT(*)
+FROM activities
+WHERE date IS NOT NULL
+GROUP BY owner_id, CAST(date AS DATE)
+ON CONFLICT (owner_id, day) DO UPDATE
+SET total_minutes = EXCLUDED.total_minutes,
+    activity_count = EXCLUDED.activity_count
+"""
+
+
+def backfill():
+    """Rebuild activity_daily from the activities table (idempotent)"""
+    from app.database import engine
+
+    with engine.begin() as conn:
+        result = conn.execute(text(BACKFILL_SQL))
+    print(f"Backfilled {result.rowcount} activity_daily rows")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] != ["backfill"]:
+        sys.exit("usage: python -m app.aggregates backfill")
+    backfill()
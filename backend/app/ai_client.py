@@ -0,0 +1,165 @@
+# backend/app/ai_client.py
+# File path: backend/app/ai_client.py
+import asyncio
+import importlib.util
+import logging
+import os
+from typing import Any, AsyncIterator, Optional
+
+from app.model_router import AllModelsFailed, ModelRouter
+
+logger = logging.getLogger(__name__)
+
+# google.genai takes over a second to import, so it is loaded on first use
+# (or by preload() right after startup) rather than at module import
+GENAI_AVAILABLE = importlib.util.find_spec("google.genai") is not None
+
+# Fallback order shared by every AI route
+GEMINI_MODELS = ["gemini-2.0-flash", "gemini-1.5-flash", "gemini-1.5-pro"]
+
+# Max in-flight Gemini calls per worker; extra calls wait for a free slot
+GEMINI_MAX_CONCURRENCY = int(os.getenv("GEMINI_MAX_CONCURRENCY", "8"))
+
+# Set GEMINI_FAKE_MODEL=1 to stream canned chat tokens locally instead of calling Gemini
+GEMINI_FAKE_MODEL = os.getenv("GEMINI_FAKE_MODEL", "").lower() in ("1", "true", "yes")
+
+# Point the SDK at another endpoint, e.g. `python -m benchmarks.fake_gemini` for local testing
+GEMINI_BASE_URL = os.getenv("GEMINI_BASE_URL")
+
+_client = None
+_semaphore: Optional[asyncio.Semaphore] = None
+
+router = ModelRouter(GEMINI_MODELS)
+
+
+def missing_dependencies() -> list[str]:
+    """Names of whatever is stopping us from calling Gemini (empty when ready)"""
+    missing = []
+    if not GENAI_AVAILABLE:
+        missing.append("Gemini SDK")
+    if not os.getenv("GEMINI_API_KEY"):
+        missing.append("GEMINI_API_KEY")
+    return missing
+
+
+def get_client():
+    """Return the process-wide Gemini client, creating it on first use.
+
+    The client owns its HTTP connection pool, so keeping a single instance
+    lets every request reuse warm connections instead of re-handshaking.
+    """
+    global _client
+    if _client is None:
+        missing = missing_dependencies()
+        if missing:
+            raise RuntimeError(f"Missing: {', '.join(missing)}")
+        from google import genai
+
+        # The SDK's aio calls run blocking requests in worker threads; an HTTP-level
+        # timeout frees the thread when the router gives up on a hung call
+        http_options = {"timeout": int(router.timeout * 1000)}
+        if GEMINI_BASE_URL:
+            http_options["base_url"] = GEMINI_BASE_URL
+        _client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"), http_options=http_options)
+    return _client
+
+
+def preload():
+    """Import the SDK and build the client ahead of the first AI request (run in a thread)"""
+    if missing_dependencies():
+        return
+    try:
+        client = get_client()
+    except Exception as e:
+        logger.warning("Gemini client preload failed", extra={"error": str(e)})
+        return
+    from app import structured_output
+
+    # A schema the SDK rejects fails every call that sends it, before any request goes out
+    for name, error in structured_output.schema_errors(client).items():
+        logger.error("Response schema rejected by the Gemini SDK", extra={"schema": name, "error": error})
+
+
+def _get_semaphore() -> asyncio.Semaphore:
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(GEMINI_MAX_CONCURRENCY)
+    return _semaphore
+
+
+async def generate_content(model: str, contents: Any, **kwargs):
+    """Run a non-blocking generate_content call, bounded by the concurrency limit"""
+    client = get_client()
+    async with _get_semaphore():
+        return await client.aio.models.generate_content(model=model, contents=contents, **kwargs)
+
+
+async def generate(contents: Any, **kwargs) -> tuple[Any, str]:
+    """generate_content on the healthiest model in the fallback chain.
+
+    Returns (response, model name); raises AllModelsFailed. Each attempt,
+    hedged backups included, takes its own concurrency slot.
+    """
+    return await router.call(lambda model: generate_content(model, contents, **kwargs))
+
+
+async def upload_file(file: Any, **kwargs):
+    """Upload a file to the Gemini Files API without blocking the event loop"""
+    client = get_client()
+    async with _get_semaphore():
+        return await client.aio.files.upload(file=file, **kwargs)
+
+
+async def fake_stream(contents: Any, delay: float = 0.02) -> AsyncIterator[str]:
+    """Offline stand-in for a streaming model: yields a canned reply word by word"""
+    reply = (
+        "Stay hydrated, aim for 30 minutes of movement today, "
+        "and build your plate around vegetables and lean protein."
+    )
+    for word in reply.split(" "):
+        await asyncio.sleep(delay)
+        yield word + " "
+
+
+async def generate_content_stream(model: str, contents: Any, **kwargs) -> AsyncIterator[str]:
+    """Yield text chunks as the model produces them.
+
+    The concurrency slot is held for the whole stream, so a long generation
+    counts against GEMINI_MAX_CONCURRENCY just like a blocking call.
+    """
+    async with _get_semaphore():
+        if GEMINI_FAKE_MODEL:
+            async for chunk in fake_stream(contents):
+                yield chunk
+            return
+        client = get_client()
+        stream = await client.aio.models.generate_content_stream(model=model, contents=contents, **kwargs)
+        async for chunk in stream:
+            if chunk.text:
+                yield chunk.text
+
+
+async def open_stream(contents: Any, **kwargs) -> tuple[Optional[str], AsyncIterator[str], str]:
+    """Start a streamed reply on the healthiest model in the fallback chain.
+
+    Waiting for the first chunk is the routed call, so it gets the router's
+    timeout, breaker probing, hedging and fallback; once a model has produced
+    text the rest of the stream stays on it. Returns (first chunk or None for
+    an empty reply, remaining chunks, model name); raises AllModelsFailed.
+    """
+    async def first_chunk(model: str):
+        stream = generate_content_stream(model=model, contents=contents, **kwargs)
+        try:
+            return await stream.__anext__(), stream
+        except StopAsyncIteration:
+            return None, stream
+        except BaseException:
+            await stream.aclose()
+            raise
+
+    async def close(opened):
+        await opened[1].aclose()
+
+    # A hedged attempt that also produced a first chunk holds a concurrency slot until closed
+    (chunk, stream), model = await router.call(first_chunk, discard=close)
+    return chunk, stream, model
@@ -1,5 +1,7 @@
 # backend/app/auth_utils.py
 # File path: backend/app/auth_utils.py
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
@@ -7,10 +9,12 @@ from passlib.context import CryptContext
 import os
 from fastapi import Depends, HTTPException
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models import User
-from app.schemas import TokenData
-from app.database import get_db
+from app.schemas import TokenData, UserResponse
+from app.database import get_db, get_read_db
+from app.cache import create_cache
 
 SECRET_KEY = os.getenv("JWT_SECRET")
 if not SECRET_KEY:
@@ -19,9 +23,22 @@ if not SECRET_KEY:
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Changing the cost factor rehashes each user's password on their next login
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+# bcrypt releases the GIL, so a thread pool gives real parallelism off the event loop
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "4"))
+# Hash/verify calls allowed to wait for a worker before we shed load with 503
+PASSWORD_HASH_MAX_QUEUE = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "64"))
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
+password_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
+_password_jobs_in_flight = 0
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
+# Authenticated users keyed by token subject; skips the users lookup on hot requests.
+# Kept short-lived because other workers only see invalidations when the entry expires.
+user_cache = create_cache("auth_user", maxsize=10000, ttl=60)
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
@@ -30,25 +47,86 @@ def get_password_hash(password: str) -> str:
     trimmed = password.encode("utf-8")[:72].decode("utf-8", errors="ignore")
     return pwd_context.hash(trimmed)
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
-    credentials_exception = HTTPException(
+def password_needs_rehash(hashed_password: str) -> bool:
+    # bcrypt hashes look like $2b$<rounds>$...
+    try:
+        rounds = int(hashed_password.split("$")[2])
+    except (IndexError, ValueError):
+        return True
+    return rounds != BCRYPT_ROUNDS or pwd_context.needs_update(hashed_password)
+
+async def _run_password_job(fn, *args):
+    """Run CPU-heavy password work in the bcrypt pool, or 503 if it's saturated"""
+    global _password_jobs_in_flight
+    if _password_jobs_in_flight >= PASSWORD_HASH_WORKERS + PASSWORD_HASH_MAX_QUEUE:
+        raise HTTPException(
+            status_code=503,
+            detail="Server busy, please retry shortly",
+            headers={"Retry-After": "1"},
+        )
+    _password_jobs_in_flight += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(password_executor, fn, *args)
+    finally:
+        _password_jobs_in_flight -= 1
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await _run_password_job(verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    return await _run_password_job(get_password_hash, password)
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=401,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+def decode_token(token: str) -> TokenData:
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         email: str = payload.get("sub")
         if email is None:
-            raise credentials_exception
-        token_data = TokenData(email=email)
+            raise _credentials_exception()
+        return TokenData(email=email)
     except JWTError:
-        raise credentials_exception
-    user = db.query(User).filter(User.email == token_data.email).first()
+        raise _credentials_exception()
+
+async def get_current_user_orm(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)) -> User:
+    """Authenticated user as a session-bound ORM row; use when the route writes to it"""
+    token_data = decode_token(token)
+    result = await db.execute(select(User).where(User.email == token_data.email))
+    user = result.scalars().first()
     if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
+    await user_cache.set(token_data.email, UserResponse.model_validate(user).model_dump())
     return user
 
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)) -> UserResponse:
+    """Authenticated user as a read-only projection, served from cache when possible"""
+    token_data = decode_token(token)
+    cached = await user_cache.get(token_data.email)
+    if cached is not None:
+        return UserResponse(**cached)
+    return UserResponse.model_validate(await get_current_user_orm(token, db))
+
+async def get_current_user_fresh(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_read_db)) -> UserResponse:
+    """Authenticated user read from the read session, bypassing the cache.
+
+    For responses tagged with the user's data version (app.http_cache): the
+    middleware reads that version from the same session, so a profile cached
+    before an update on another worker can't go out under the new ETag.
+    """
+    token_data = decode_token(token)
+    user = (await db.execute(select(User).where(User.email == token_data.email))).scalars().first()
+    if user is None:
+        raise _credentials_exception()
+    return UserResponse.model_validate(user)
+
+async def invalidate_cached_user(email: str):
+    await user_cache.delete(email)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
     expire = datetime.utcnow() + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
@@ -0,0 +1,125 @@
+# backend/app/cache.py
+# File path: backend/app/cache.py
+import json
+import os
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Optional
+
+from app import metrics
+
+try:
+    from redis import asyncio as redis_asyncio
+except ImportError:
+    redis_asyncio = None
+
+
+class CacheBackend(ABC):
+    """Minimal async key/value interface shared by every cache backend.
+
+    Values must be JSON-serializable so the same callers work against the
+    in-process backend and a shared one such as Redis.
+    """
+
+    def __init__(self, name: str = "default"):
+        self.name = name
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, key: str) -> Optional[Any]:
+        value = await self._get(key)
+        if value is None:
+            self.misses += 1
+            metrics.CACHE_LOOKUPS.labels(self.name, "miss").inc()
+        else:
+            self.hits += 1
+            metrics.CACHE_LOOKUPS.labels(self.name, "hit").inc()
+        return value
+
+    @abstractmethod
+    async def set(self, key: str, value: Any) -> None:
+        ...
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        ...
+
+    @abstractmethod
+    async def _get(self, key: str) -> Optional[Any]:
+        ...
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "backend": type(self).__name__,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+class InMemoryCache(CacheBackend):
+    """Per-process LRU cache with a fixed time-to-live per entry"""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 3600, name: str = "default"):
+        super().__init__(name)
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+
+    async def _get(self, key: str) -> Optional[Any]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: Any) -> None:
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    async def delete(self, key: str) -> None:
+        self._data.pop(key, None)
+
+    def stats(self) -> dict:
+        return {**super().stats(), "size": len(self._data), "maxsize": self.maxsize}
+
+
+class RedisCache(CacheBackend):
+    """Cache shared by all workers, backed by Redis (eviction via maxmemory-policy)"""
+
+    def __init__(self, url: str, ttl: float = 3600, prefix: str = "keepitfit:", name: str = "default"):
+        super().__init__(name)
+        if redis_asyncio is None:
+            raise RuntimeError("redis package not installed")
+        self.ttl = int(ttl)
+        self.prefix = prefix
+        self._redis = redis_asyncio.from_url(url)
+
+    async def _get(self, key: str) -> Optional[Any]:
+        raw = await self._redis.get(self.prefix + key)
+        return json.loads(raw) if raw is not None else None
+
+    async def set(self, key: str, value: Any) -> None:
+        await self._redis.set(self.prefix + key, json.dumps(value), ex=self.ttl)
+
+    async def delete(self, key: str) -> None:
+        await self._redis.delete(self.prefix + key)
+
+
+def create_cache(name: str, maxsize: int = 1024, ttl: float = 3600) -> CacheBackend:
+    """Build a cache from <NAME>_CACHE_BACKEND / _TTL / _MAXSIZE env settings"""
+    env = name.upper()
+    backend = os.getenv(f"{env}_CACHE_BACKEND", "memory")
+    ttl = float(os.getenv(f"{env}_CACHE_TTL", ttl))
+    if backend == "redis":
+        return RedisCache(os.getenv("REDIS_URL", "redis://localhost:6379/0"), ttl=ttl, prefix=f"{name}:", name=name)
+    maxsize = int(os.getenv(f"{env}_CACHE_MAXSIZE", maxsize))
+    return InMemoryCache(maxsize=maxsize, ttl=ttl, name=name)
@@ -0,0 +1,116 @@
+# backend/app/compression.py
+# File path: backend/app/compression.py
+"""Response compression.
+
+Brotli when the client accepts it, gzip otherwise (also if the ``brotli``
+package from requirements.txt is missing). Only complete bodies of at least
+COMPRESSION_MIN_SIZE bytes are compressed; streamed responses such as
+/chat/stream pass through untouched so tokens aren't held back. Every
+response that could have been compressed carries Vary: Accept-Encoding.
+
+    COMPRESSION_MIN_SIZE=1024   bytes; smaller bodies aren't worth the CPU
+    GZIP_LEVEL=6
+    BROTLI_QUALITY=4            0-11; 4 is close to gzip -6 in speed and usually smaller
+"""
+import gzip
+import os
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from app import metrics
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "4"))
+
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "image/svg+xml")
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """Best encoding we can produce for an Accept-Encoding header, or None"""
+    accepted = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name.strip()] = q
+    wildcard = accepted.get("*", 0.0)
+    if brotli is not None and accepted.get("br", wildcard) > 0:
+        return "br"
+    if accepted.get("gzip", wildcard) > 0:
+        return "gzip"
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing single-message responses above ``minimum_size``"""
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        # No acceptable encoding still goes through below: those responses need Vary too
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        start = None
+
+        async def send_compressed(message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                # Hold the headers until the first body chunk shows whether this is worth compressing
+                start = message
+                return
+            if start is None:
+                await send(message)
+                return
+            headers = MutableHeaders(raw=list(start.get("headers", [])))
+            body = message.get("body", b"")
+            compressible = "content-encoding" not in headers and (
+                headers.get("content-type", "").startswith(COMPRESSIBLE_TYPES) or start["status"] == 304
+            )
+            if compressible:
+                # The same URL may go out compressed or not depending on Accept-Encoding,
+                # so shared caches must key on it whichever way this response went
+                headers.add_vary_header("Accept-Encoding")
+            if (
+                encoding is None
+                or not compressible
+                or message.get("more_body", False)
+                or len(body) < self.minimum_size
+            ):
+                start["headers"] = headers.raw
+                await send(start)
+                start = None
+                await send(message)
+                return
+
+            compressed = compress(body, encoding)
+            metrics.COMPRESSED_BYTES.labels(encoding, "raw").inc(len(body))
+            metrics.COMPRESSED_BYTES.labels(encoding, "sent").inc(len(compressed))
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(compressed))
+            start["headers"] = headers.raw
+            await send(start)
+            start = None
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_compressed)
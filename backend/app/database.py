@@ -1,19 +1,133 @@
 # backend/app/database.py
 # File path: backend/app/database.py
+"""Engines and sessions.
+
+Pool settings come from the environment:
+
+    DB_POOL_SIZE=5              connections kept open per worker
+    DB_MAX_OVERFLOW=10          extra connections allowed under burst
+    DB_POOL_TIMEOUT=30          seconds to wait for a free connection
+    DB_POOL_RECYCLE=1800        reconnect connections older than this (seconds, -1 = never)
+    DB_POOL_PRE_PING=true       test connections on checkout
+    DB_STATEMENT_TIMEOUT_MS=0   server-side statement timeout (0 = none)
+    DB_PGBOUNCER=false          running behind a transaction-pooling proxy
+    DATABASE_REPLICA_URL=       read replica for get_read_db (defaults to the primary)
+
+With DB_PGBOUNCER the proxy does the pooling, so the async engines use
+NullPool and asyncpg's prepared-statement caches are switched off (prepared
+statements don't survive transaction pooling). PgBouncer rejects startup
+parameters, so DB_STATEMENT_TIMEOUT_MS is not applied there either; set it
+on the database role instead (ALTER ROLE ... SET statement_timeout).
+"""
+from uuid import uuid4
+
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 import os
 
+from app import metrics
+
 DATABASE_URL = os.getenv("DATABASE_URL", "postgresql://user:password@db:5432/techheal_db")
+DATABASE_REPLICA_URL = os.getenv("DATABASE_REPLICA_URL") or None
+
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))
+DB_PGBOUNCER = os.getenv("DB_PGBOUNCER", "false").lower() in ("1", "true", "yes")
+
+
+def to_async_url(url: str) -> str:
+    """Rewrite a plain/psycopg2 Postgres DSN to use the asyncpg driver"""
+    for prefix in ("postgresql+psycopg2://", "postgresql://", "postgres://"):
+        if url.startswith(prefix):
+            return "postgresql+asyncpg://" + url[len(prefix):]
+    return url
+
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", to_async_url(DATABASE_URL))
+ASYNC_DATABASE_REPLICA_URL = os.getenv(
+    "ASYNC_DATABASE_REPLICA_URL", to_async_url(DATABASE_REPLICA_URL) if DATABASE_REPLICA_URL else None
+)
+
+
+def _pool_options() -> dict:
+    if DB_PGBOUNCER:
+        return {"poolclass": NullPool, "pool_pre_ping": DB_POOL_PRE_PING}
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
 
-engine = create_engine(DATABASE_URL)
+def _async_connect_args() -> dict:
+    if DB_PGBOUNCER:
+        return {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            # Unique names so a statement prepared on one server connection never clashes on another
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+        }
+    if DB_STATEMENT_TIMEOUT_MS:
+        return {"server_settings": {"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)}}
+    return {}
+
+
+def _sync_connect_args() -> dict:
+    if DB_STATEMENT_TIMEOUT_MS and not DB_PGBOUNCER:
+        return {"options": f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"}
+    return {}
+
+
+def _create_async_engine(url: str, name: str):
+    async_engine = create_async_engine(url, connect_args=_async_connect_args(), **_pool_options())
+    metrics.instrument_engine(async_engine.sync_engine)
+    metrics.instrument_pool(async_engine.sync_engine, name)
+    return async_engine
+
+
+def _session_factory(bind) -> async_sessionmaker:
+    return async_sessionmaker(
+        bind=bind,
+        class_=AsyncSession,
+        autoflush=False,
+        expire_on_commit=False,
+    )
+
+
+# Sync engine is kept for schema creation and offline scripts only;
+# request handlers go through the async engines below.
+engine = create_engine(
+    DATABASE_URL,
+    pool_pre_ping=DB_POOL_PRE_PING,
+    pool_recycle=DB_POOL_RECYCLE,
+    connect_args=_sync_connect_args(),
+)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+metrics.instrument_engine(engine)
+
+async_engine = _create_async_engine(ASYNC_DATABASE_URL, "primary")
+AsyncSessionLocal = _session_factory(async_engine)
+
+# Reads that can tolerate replication lag; without a replica they share the primary pool
+replica_engine = _create_async_engine(ASYNC_DATABASE_REPLICA_URL, "replica") if ASYNC_DATABASE_REPLICA_URL else None
+AsyncReadSessionLocal = _session_factory(replica_engine) if replica_engine is not None else AsyncSessionLocal
+
 Base = declarative_base()
 
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+async def get_read_db():
+    """Session for read-only handlers; goes to DATABASE_REPLICA_URL when one is set"""
+    async with AsyncReadSessionLocal() as db:
         yield db
-    finally:
-        db.close()
\ No newline at end of file
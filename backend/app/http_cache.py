@@ -0,0 +1,123 @@
+# backend/app/http_cache.py
+# File path: backend/app/http_cache.py
+"""Conditional GETs from per-user data versions.
+
+users.data_version is bumped (bump_data_version) in the same transaction as
+every write to a user's activities, meals or profile. For the read endpoints
+in CONDITIONAL_PATHS the middleware derives a weak ETag from that version,
+today's date (stats and streaks roll over at midnight) and the request URL,
+so a matching If-None-Match is answered with 304 before the handler runs:
+one indexed lookup instead of the endpoint's queries and serialization.
+"""
+import hashlib
+from datetime import datetime
+from typing import Awaitable, Callable, Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.datastructures import Headers
+from starlette.routing import Match
+
+from app import metrics
+from app.auth_utils import decode_token
+from app.database import AsyncReadSessionLocal
+from app.models import User
+
+# Authenticated GETs whose responses depend only on the caller's own data
+CONDITIONAL_PATHS = frozenset({
+    "/auth/me",
+    "/activity/recent",
+    "/activity/meal-insights",
+    "/activity/stats",
+    "/activity/nutrition-summary",
+    "/plan/wellness-score",
+    "/dashboard",
+})
+
+CACHE_CONTROL = "private, no-cache"
+
+VersionLookup = Callable[[str], Awaitable[Optional[tuple[int, int]]]]
+
+
+async def bump_data_version(db: AsyncSession, owner_id: int):
+    """Invalidate every ETag handed out for this user. Runs in the caller's transaction."""
+    await db.execute(update(User).where(User.id == owner_id).values(data_version=User.data_version + 1))
+
+
+async def lookup_data_version(email: str) -> Optional[tuple[int, int]]:
+    """(user id, data version) for a token subject, read where the handlers read"""
+    async with AsyncReadSessionLocal() as db:
+        row = (await db.execute(select(User.id, User.data_version).where(User.email == email))).first()
+    return tuple(row) if row else None
+
+
+def version_etag(user_id: int, version: int, path: str, query: bytes) -> str:
+    digest = hashlib.sha1(f"{datetime.utcnow().date()}|{path}?".encode("utf-8") + query).hexdigest()[:16]
+    return f'W/"{user_id}.{version}.{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against ``etag`` (RFC 9110 13.1.2)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in if_none_match.split(","))
+
+
+def _bearer_subject(authorization: Optional[str]) -> Optional[str]:
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        return decode_token(token).email
+    except Exception:
+        # Let the handler produce the usual 401
+        return None
+
+
+class ConditionalGetMiddleware:
+    """ASGI middleware adding version ETags to CONDITIONAL_PATHS and answering 304 early"""
+
+    def __init__(self, app, paths=CONDITIONAL_PATHS, lookup: VersionLookup = lookup_data_version):
+        self.app = app
+        self.paths = paths
+        self.lookup = lookup
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD") or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+        headers = Headers(scope=scope)
+        subject = _bearer_subject(headers.get("authorization"))
+        found = await self.lookup(subject) if subject else None
+        if found is None:
+            await self.app(scope, receive, send)
+            return
+
+        etag = version_etag(*found, scope["path"], scope.get("query_string", b""))
+        cache_headers = [(b"etag", etag.encode("latin-1")), (b"cache-control", CACHE_CONTROL.encode("latin-1"))]
+        if etag_matches(headers.get("if-none-match"), etag):
+            self._tag_route(scope)
+            metrics.CONDITIONAL_GETS.labels(scope["path"], "not_modified").inc()
+            await send({"type": "http.response.start", "status": 304, "headers": cache_headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        async def send_with_etag(message):
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                metrics.CONDITIONAL_GETS.labels(scope["path"], "modified").inc()
+                kept = [(k, v) for k, v in message.get("headers", []) if k.lower() not in (b"etag", b"cache-control")]
+                message["headers"] = kept + cache_headers
+            await send(message)
+
+        await self.app(scope, receive, send_with_etag)
+
+    @staticmethod
+    def _tag_route(scope):
+        # The router never ran, so give MetricsMiddleware the route it would have matched
+        for route in getattr(scope.get("app"), "routes", ()):
+            if route.matches(scope)[0] == Match.FULL:
+                scope["route"] = route
+                return
@@ -0,0 +1,136 @@
+# backend/app/jobs.py
+# File path: backend/app/jobs.py
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Optional
+
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import AsyncSessionLocal
+from app.logging_config import request_id_var
+from app.models import Job
+
+# Worker tasks per API process
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+# Idle workers re-check the table this often (seconds); enqueue wakes them sooner
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "2"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+# A running job whose lease expires (worker crashed/restarted) is picked up again
+JOB_LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", "300"))
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[[Job, AsyncSession], Awaitable[dict]]
+
+_handlers: dict[str, JobHandler] = {}
+_workers: list[asyncio.Task] = []
+_wakeup: Optional[asyncio.Event] = None
+
+
+def register_handler(kind: str, handler: JobHandler):
+    """Register the coroutine that runs jobs of this kind.
+
+    The handler gets the claimed job and a session; anything it adds to the
+    session is committed together with the job's final status.
+    """
+    _handlers[kind] = handler
+
+
+async def enqueue(db: AsyncSession, kind: str, payload: dict, owner_id: int) -> Job:
+    job = Job(kind=kind, payload=payload, owner_id=owner_id, status="pending")
+    db.add(job)
+    await db.commit()
+    await db.refresh(job)
+    if _wakeup is not None:
+        _wakeup.set()
+    return job
+
+
+async def claim_next(db: AsyncSession) -> Optional[Job]:
+    """Lock and lease the oldest runnable job; SKIP LOCKED keeps workers from colliding"""
+    now = datetime.utcnow()
+    result = await db.execute(
+        select(Job)
+        .where(
+            or_(Job.status == "pending", Job.status == "running"),
+            Job.run_after <= now,
+        )
+        .order_by(Job.id)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+    )
+    job = result.scalars().first()
+    if job is None:
+        return None
+    job.status = "running"
+    job.attempts += 1
+    job.run_after = now + timedelta(seconds=JOB_LEASE_SECONDS)
+    await db.commit()
+    return job
+
+
+async def run_job(db: AsyncSession, job: Job):
+    # Log lines from the handler correlate on the job instead of a request
+    token = request_id_var.set(f"job-{job.id}")
+    try:
+        await _run_job(db, job)
+    finally:
+        request_id_var.reset(token)
+
+
+async def _run_job(db: AsyncSession, job: Job):
+    handler = _handlers.get(job.kind)
+    try:
+        if handler is None:
+            raise RuntimeError(f"No handler registered for job kind {job.kind!r}")
+        job.result = await handler(job, db)
+        job.status = "done"
+        job.error = None
+    except Exception as e:
+        # Discard whatever the handler staged, then reload the job row
+        await db.rollback()
+        await db.refresh(job)
+        logger.exception("Job failed", extra={"job_id": job.id, "kind": job.kind, "attempt": job.attempts})
+        job.error = str(e)
+        if job.attempts >= JOB_MAX_ATTEMPTS:
+            job.status = "failed"
+        else:
+            job.status = "pending"
+            job.run_after = datetime.utcnow() + timedelta(seconds=2 ** job.attempts)
+    await db.commit()
+
+
+async def worker_loop():
+    while True:
+        try:
+            async with AsyncSessionLocal() as db:
+                job = await claim_next(db)
+                if job is not None:
+                    await run_job(db, job)
+                    continue
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Job worker error")
+        _wakeup.clear()
+        try:
+            await asyncio.wait_for(_wakeup.wait(), timeout=JOB_POLL_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
+
+
+def start_workers(count: int = JOB_WORKERS):
+    global _wakeup
+    _wakeup = asyncio.Event()
+    for _ in range(count):
+        _workers.append(asyncio.create_task(worker_loop()))
+
+
+async def stop_workers():
+    for task in _workers:
+        task.cancel()
+    await asyncio.gather(*_workers, return_exceptions=True)
+    _workers.clear()
@@ -1,30 +1,63 @@
 # backend/app/main.py
 # File path: backend/app/main.py
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi import FastAPI
-from app.routes import auth, upload, plan, activity, chat
-from app.database import engine, Base
+from app.routes import auth, upload, plan, activity, chat, dashboard
+from app import ai_client, jobs, metrics, storage, wellness
+from app.compression import CompressionMiddleware
+from app.http_cache import ConditionalGetMiddleware
+from app.responses import FastJSONResponse
+from app.logging_config import RequestIdMiddleware, setup_logging, shutdown_logging
 from dotenv import load_dotenv
 
 load_dotenv()
+setup_logging()
 
-# create all tables from Base
-Base.metadata.create_all(bind=engine)
+# Schema is managed by Alembic migrations: run `alembic upgrade head` before starting
 
-app = FastAPI(title="TechHeal API")
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Nothing here waits on the network: the bucket check retries in the
+    # background and the Gemini SDK loads in a thread once we're serving
+    storage.start_init()
+    jobs.start_workers()
+    wellness.start_scheduler()
+    preload = asyncio.create_task(run_in_threadpool(ai_client.preload))
+    yield
+    await asyncio.gather(preload, return_exceptions=True)
+    await wellness.stop_scheduler()
+    await jobs.stop_workers()
+    await storage.stop_init()
+    shutdown_logging()
+
+
+app = FastAPI(title="TechHeal API", lifespan=lifespan, default_response_class=FastJSONResponse)
+
+# Innermost first: 304s skip the handler, then bodies are compressed, then CORS headers go on everything
+app.add_middleware(ConditionalGetMiddleware)
+app.add_middleware(CompressionMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Request-ID", "ETag"],
 )
+app.add_middleware(metrics.MetricsMiddleware)
+app.add_middleware(RequestIdMiddleware)
 
 app.include_router(auth.router, prefix="/auth", tags=["Auth"])
 app.include_router(upload.router, prefix="/upload", tags=["Upload"])
 app.include_router(plan.router, prefix="/plan", tags=["Plan"])
 app.include_router(activity.router, prefix="/activity", tags=["Activity"])
 app.include_router(chat.router, prefix="/chat", tags=["Chat"])
+app.include_router(dashboard.router, prefix="/dashboard", tags=["Dashboard"])
+
+app.add_route("/metrics", metrics.metrics_endpoint, include_in_schema=False)
 
 @app.get("/")
 def root():
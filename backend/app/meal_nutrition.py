@@ -0,0 +1,109 @@
+# backend/app/meal_nutrition.py
+# File path: backend/app/meal_nutrition.py
+"""Typed nutrition columns on meal_analyses.
+
+calories, protein_g, carbs_g and fat_g are copied out of analysis_data when
+a meal is saved (extract_macros), so summaries aggregate in SQL instead of
+loading every JSON document. After ``alembic upgrade head``, run
+``python -m app.meal_nutrition backfill`` once to fill the columns for
+existing rows; it works in id batches and can be re-run safely.
+"""
+import math
+import re
+import sys
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import Date, Select, cast, func, literal_column, select, text, tuple_
+
+from app.models import MealAnalysis
+
+MACRO_FIELDS = ("calories", "protein_g", "carbs_g", "fat_g")
+
+# Non-negative decimal, optionally with an exponent; shared with the backfill SQL.
+# Digit and exponent lengths are capped so every match fits a double: "1e999"
+# (or a tiny value that underflows) would make Postgres' CAST fail the whole
+# backfill batch.
+NUMBER_PATTERN = r"^\s*[0-9]{1,30}(\.[0-9]{1,30})?([eE][+-]?[0-9]{1,2})?\s*$"
+_number = re.compile(NUMBER_PATTERN)
+
+BACKFILL_BATCH = 10000
+
+
+def _to_number(value) -> Optional[float]:
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, str):
+        value = float(value) if _number.match(value) else None
+    if not isinstance(value, (int, float)) or value < 0:
+        return None
+    try:
+        # Ints too large for a float (e.g. 10**400) raise OverflowError here
+        number = float(value)
+    except OverflowError:
+        return None
+    return number if math.isfinite(number) else None
+
+
+def extract_macros(analysis: dict) -> dict[str, Optional[float]]:
+    """Column values for a meal's analysis_data; anything missing or non-numeric is NULL"""
+    if not isinstance(analysis, dict):
+        return dict.fromkeys(MACRO_FIELDS)
+    return {field: _to_number(analysis.get(field)) for field in MACRO_FIELDS}
+
+
+def nutrition_summary_query(owner_id: int, start: datetime, end: datetime) -> Select:
+    """Meal count and macro sums per UTC day, per ISO week and overall, in one pass.
+
+    GROUPING SETS returns three kinds of rows: day set (week_start NULL),
+    week set (day NULL) and the grand total (both NULL).
+    """
+    day = cast(MealAnalysis.date, Date)
+    # Literal rather than a bound parameter so GROUP BY matches the select list
+    week = cast(func.date_trunc(literal_column("'week'"), MealAnalysis.date), Date)
+    return (
+        select(
+            day.label("day"),
+            week.label("week_start"),
+            func.count().label("meals"),
+            *(func.coalesce(func.sum(getattr(MealAnalysis, field)), 0).label(field) for field in MACRO_FIELDS),
+        )
+        .where(MealAnalysis.owner_id == owner_id, MealAnalysis.date >= start, MealAnalysis.date < end)
+        .group_by(func.grouping_sets(tuple_(day), tuple_(week), tuple_()))
+    )
+
+
+def _json_number(field: str) -> str:
+    return (
+        f"CASE WHEN analysis_data->>'{field}' ~ '{NUMBER_PATTERN}' "
+        f"THEN CAST(analysis_data->>'{field}' AS DOUBLE PRECISION) END"
+    )
+
+
+BACKFILL_SQL = f"""
+UPDATE meal_analyses
+SET {", ".join(f"{field} = {_json_number(field)}" for field in MACRO_FIELDS)}
+WHERE id > :after AND id <= :upto
+  AND {" AND ".join(f"{field} IS NULL" for field in MACRO_FIELDS)}
+  AND ({" OR ".join(f"analysis_data->>'{field}' ~ '{NUMBER_PATTERN}'" for field in MACRO_FIELDS)})
+"""
+
+
+def backfill(batch: int = BACKFILL_BATCH):
+    """Fill the nutrition columns from analysis_data for rows that have none (idempotent)"""
+    from app.database import engine
+
+    with engine.connect() as conn:
+        last_id = conn.execute(text("SELECT COALESCE(MAX(id), 0) FROM meal_analyses")).scalar_one()
+    updated = 0
+    # One short transaction per id range keeps row locks brief on a live table
+    for after in range(0, last_id, batch):
+        with engine.begin() as conn:
+            updated += conn.execute(text(BACKFILL_SQL), {"after": after, "upto": after + batch}).rowcount
+    print(f"Backfilled nutrition columns on {updated} meal_analyses rows")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] != ["backfill"]:
+        sys.exit("usage: python -m app.meal_nutrition backfill")
+    backfill()
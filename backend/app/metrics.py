@@ -0,0 +1,170 @@
+# backend/app/metrics.py
+# File path: backend/app/metrics.py
+"""Prometheus metrics, served at /metrics.
+
+Covers HTTP latency per route template, conditional GET and compression
+outcomes, SQL statements and connection pool usage (via SQLAlchemy engine
+events), MinIO puts, Gemini calls per model, cache lookups and the stages
+of the meal-upload pipeline. With several uvicorn/gunicorn workers, set
+PROMETHEUS_MULTIPROC_DIR to an empty directory so /metrics aggregates
+every worker.
+"""
+import os
+import time
+from contextlib import contextmanager
+
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+from prometheus_client import multiprocess
+from sqlalchemy import event
+from starlette.requests import Request
+from starlette.responses import Response
+
+# Seconds; covers fast DB reads up to slow multi-model LLM calls
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Time to produce the response headers, by route template",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+DB_QUERIES = Histogram(
+    "db_query_duration_seconds",
+    "SQL statement execution time",
+    ["statement"],
+    buckets=LATENCY_BUCKETS,
+)
+MINIO_PUT_LATENCY = Histogram(
+    "minio_put_duration_seconds",
+    "MinIO put_object latency",
+    ["kind"],
+    buckets=LATENCY_BUCKETS,
+)
+MINIO_PUT_BYTES = Counter("minio_put_bytes_total", "Bytes written to MinIO", ["kind"])
+LLM_LATENCY = Histogram(
+    "llm_call_duration_seconds",
+    "Gemini call latency per model and outcome",
+    ["model", "outcome"],
+    buckets=LATENCY_BUCKETS,
+)
+LLM_FALLBACKS = Counter("llm_fallbacks_total", "Calls served by a model other than the first choice", ["model"])
+LLM_HEDGES = Counter("llm_hedges_total", "Backup calls started because the first model was slow", ["model"])
+CONDITIONAL_GETS = Counter(
+    "http_conditional_gets_total", "Version-tagged GETs answered in full or with 304", ["route", "result"]
+)
+COMPRESSED_BYTES = Counter(
+    "http_compressed_bytes_total", "Compressed response bodies, size before and after", ["encoding", "stage"]
+)
+CACHE_LOOKUPS = Counter("cache_lookups_total", "Cache lookups by cache and result", ["cache", "result"])
+DB_POOL_IN_USE = Gauge(
+    "db_pool_connections_in_use", "Connections checked out of the pool", ["pool"], multiprocess_mode="livesum"
+)
+DB_POOL_CAPACITY = Gauge(
+    "db_pool_capacity", "pool_size + max_overflow; compare with connections in use for saturation",
+    ["pool"], multiprocess_mode="livesum",
+)
+STAGE_LATENCY = Histogram(
+    "pipeline_stage_duration_seconds",
+    "Time spent in each stage of a multi-step pipeline",
+    ["pipeline", "stage"],
+    buckets=LATENCY_BUCKETS,
+)
+
+
+@contextmanager
+def stage(pipeline: str, name: str):
+    """Time a block as one stage of ``pipeline``"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_LATENCY.labels(pipeline, name).observe(time.perf_counter() - started)
+
+
+def observe_minio_put(kind: str, seconds: float, size: int):
+    MINIO_PUT_LATENCY.labels(kind).observe(seconds)
+    MINIO_PUT_BYTES.labels(kind).inc(size)
+
+
+def _statement_kind(statement: str) -> str:
+    words = statement.lstrip().split(None, 1)
+    return words[0].upper() if words else "UNKNOWN"
+
+
+def instrument_engine(engine):
+    """Count and time every statement run on a (sync) SQLAlchemy engine"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["query_started"].pop()
+        DB_QUERIES.labels(_statement_kind(statement)).observe(time.perf_counter() - started)
+
+    @event.listens_for(engine, "handle_error")
+    def _error(context):
+        stack = context.connection.info.get("query_started") if context.connection is not None else None
+        if stack:
+            stack.pop()
+
+
+def instrument_pool(engine, name: str):
+    """Track connections in use and capacity of an engine's pool under label ``name``"""
+    pool = engine.pool
+    if hasattr(pool, "size"):
+        DB_POOL_CAPACITY.labels(name).set(pool.size() + max(pool._max_overflow, 0))
+    in_use = DB_POOL_IN_USE.labels(name)
+
+    @event.listens_for(engine, "checkout")
+    def _checkout(dbapi_connection, connection_record, connection_proxy):
+        in_use.inc()
+
+    @event.listens_for(engine, "checkin")
+    def _checkin(dbapi_connection, connection_record):
+        in_use.dec()
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording request latency against the matched route template.
+
+    Labels use the template (/upload/jobs/{job_id}), not the raw path, so
+    cardinality stays bounded; unmatched paths are grouped as "unmatched".
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+        responded = False
+
+        def observe(status: int):
+            route = getattr(scope.get("route"), "path", "unmatched")
+            REQUEST_LATENCY.labels(scope["method"], route, str(status)).observe(time.perf_counter() - started)
+
+        async def send_wrapper(message):
+            nonlocal responded
+            if message["type"] == "http.response.start":
+                responded = True
+                observe(message["status"])
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception:
+            if not responded:
+                observe(500)
+            raise
+
+
+def metrics_endpoint(request: Request) -> Response:
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
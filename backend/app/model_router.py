@@ -0,0 +1,280 @@
+# backend/app/model_router.py
+# File path: backend/app/model_router.py
+"""Health-aware routing over the Gemini fallback chain.
+
+Each model gets a circuit breaker: after BREAKER_FAILURES consecutive
+transient failures it is skipped for BREAKER_COOLDOWN seconds, then a
+single probe call decides whether it closes again. Calls go to the first
+available model in preference order, each bounded by a timeout; with
+hedging enabled, a slow call is raced against the next model after
+HEDGE_AFTER seconds. Only transient failures (timeouts, connection errors,
+429 and 5xx) count against a model or trigger a fallback; anything else is
+the request's fault and is raised straight away.
+"""
+import asyncio
+import os
+import sys
+import time
+from typing import Awaitable, Callable, Optional, TypeVar
+
+from app import metrics
+
+T = TypeVar("T")
+
+# Per-attempt timeout for one model call (seconds)
+GEMINI_TIMEOUT_SECONDS = float(os.getenv("GEMINI_TIMEOUT_SECONDS", "30"))
+# Consecutive failures that open a model's breaker, and how long it stays open
+GEMINI_BREAKER_FAILURES = int(os.getenv("GEMINI_BREAKER_FAILURES", "3"))
+GEMINI_BREAKER_COOLDOWN = float(os.getenv("GEMINI_BREAKER_COOLDOWN", "30"))
+# Start a backup call on the next model after this many seconds (0 disables hedging)
+GEMINI_HEDGE_AFTER = float(os.getenv("GEMINI_HEDGE_AFTER", "0"))
+
+# Weight of the newest sample in the moving averages
+EWMA_ALPHA = 0.2
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class AllModelsFailed(RuntimeError):
+    def __init__(self, last_error: Optional[BaseException]):
+        super().__init__(str(last_error) if last_error else "All models failed")
+        self.last_error = last_error
+
+
+def _transport_errors() -> tuple[type, ...]:
+    # Looked up lazily so neither HTTP library is imported just to classify errors;
+    # whichever one the SDK uses is loaded by the time it raises
+    errors = []
+    requests = sys.modules.get("requests")
+    if requests is not None:
+        errors += [requests.exceptions.ConnectionError, requests.exceptions.Timeout]
+    httpx = sys.modules.get("httpx")
+    if httpx is not None:
+        errors.append(httpx.TransportError)
+    return tuple(errors)
+
+
+def is_transient(error: BaseException) -> bool:
+    """True if the failure says something about the model's health rather than the request"""
+    if isinstance(error, (asyncio.TimeoutError, TimeoutError, ConnectionError) + _transport_errors()):
+        return True
+    # google-genai APIError carries .code, httpx/openai errors .status_code
+    status = getattr(error, "code", None)
+    if not isinstance(status, int):
+        status = getattr(error, "status_code", None)
+    return isinstance(status, int) and (status == 429 or status >= 500)
+
+
+class ModelHealth:
+    """Breaker state and running latency/error averages for one model"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.probing = False
+        self.calls = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.latency_ewma: Optional[float] = None
+        self.error_rate_ewma = 0.0
+
+    def available(self, now: float, cooldown: float) -> bool:
+        if self.state == OPEN and now - self.opened_at >= cooldown:
+            self.state = HALF_OPEN
+        if self.state == HALF_OPEN:
+            # One probe at a time; everyone else keeps skipping the model
+            return not self.probing
+        return self.state == CLOSED
+
+    def record_success(self, latency: float):
+        self.calls += 1
+        self.consecutive_failures = 0
+        self.state = CLOSED
+        self.probing = False
+        self.latency_ewma = latency if self.latency_ewma is None else (
+            EWMA_ALPHA * latency + (1 - EWMA_ALPHA) * self.latency_ewma
+        )
+        self.error_rate_ewma *= 1 - EWMA_ALPHA
+
+    def record_failure(self, now: float, threshold: int, timed_out: bool = False):
+        self.calls += 1
+        self.failures += 1
+        self.timeouts += timed_out
+        self.consecutive_failures += 1
+        self.probing = False
+        self.error_rate_ewma = EWMA_ALPHA + (1 - EWMA_ALPHA) * self.error_rate_ewma
+        if self.state == HALF_OPEN or self.consecutive_failures >= threshold:
+            self.state = OPEN
+            self.opened_at = now
+
+    def snapshot(self) -> dict:
+        return {
+            "state": self.state,
+            "calls": self.calls,
+            "failures": self.failures,
+            "timeouts": self.timeouts,
+            "consecutive_failures": self.consecutive_failures,
+            "latency_ms": None if self.latency_ewma is None else round(self.latency_ewma * 1000, 1),
+            "error_rate": round(self.error_rate_ewma, 3),
+        }
+
+
+class ModelRouter:
+    def __init__(
+        self,
+        models: list[str],
+        timeout: float = GEMINI_TIMEOUT_SECONDS,
+        failure_threshold: int = GEMINI_BREAKER_FAILURES,
+        cooldown: float = GEMINI_BREAKER_COOLDOWN,
+        hedge_after: float = GEMINI_HEDGE_AFTER,
+        clock: Callable[[], float] = time.monotonic,
+        transient: Callable[[BaseException], bool] = is_transient,
+    ):
+        self.models = list(models)
+        self.timeout = timeout
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.hedge_after = hedge_after
+        self.clock = clock
+        self.transient = transient
+        self.health = {name: ModelHealth(name) for name in self.models}
+        # Calls served by a model other than the first choice, and hedge launches
+        self.fallbacks = 0
+        self.hedges = 0
+
+    def candidates(self) -> list[str]:
+        """Models to try, in preference order, skipping open breakers.
+
+        If every breaker is open, the one that opened first is moved to
+        half-open early so a full outage still gets a single probe instead of
+        failing without a call; while that probe is in flight the list is empty.
+        """
+        now = self.clock()
+        available = [name for name in self.models if self.health[name].available(now, self.cooldown)]
+        if available:
+            return available
+        idle = [name for name in self.models if not self.health[name].probing]
+        if not idle:
+            return []
+        first_opened = min(idle, key=lambda name: self.health[name].opened_at)
+        self.health[first_opened].state = HALF_OPEN
+        return [first_opened]
+
+    def _begin(self, model: str):
+        health = self.health[model]
+        if health.state == HALF_OPEN:
+            health.probing = True
+
+    def record_success(self, model: str, latency: float):
+        self.health[model].record_success(latency)
+        metrics.LLM_LATENCY.labels(model, "ok").observe(latency)
+
+    def record_failure(self, model: str, latency: float, timed_out: bool = False):
+        self.health[model].record_failure(self.clock(), self.failure_threshold, timed_out)
+        metrics.LLM_LATENCY.labels(model, "timeout" if timed_out else "error").observe(latency)
+
+    async def _attempt(self, model: str, call: Callable[[str], Awaitable[T]], timeout: float) -> T:
+        started = self.clock()
+        try:
+            result = await asyncio.wait_for(call(model), timeout)
+        except asyncio.TimeoutError:
+            self.record_failure(model, self.clock() - started, timed_out=True)
+            raise
+        except asyncio.CancelledError:
+            # Lost a hedge race; says nothing about the model's health
+            self.health[model].probing = False
+            raise
+        except Exception as e:
+            if self.transient(e):
+                self.record_failure(model, self.clock() - started)
+            else:
+                # Bad request, auth, or an SDK error before anything was sent: not the model's fault
+                self.health[model].probing = False
+            raise
+        self.record_success(model, self.clock() - started)
+        return result
+
+    async def call(
+        self,
+        call: Callable[[str], Awaitable[T]],
+        timeout: Optional[float] = None,
+        hedge_after: Optional[float] = None,
+        discard: Optional[Callable[[T], Awaitable[None]]] = None,
+    ) -> tuple[T, str]:
+        """Run call(model) on the best available model; returns (result, model name).
+
+        Raises AllModelsFailed when every candidate failed transiently, or
+        when every breaker is open and another call is already probing; any
+        other error is raised as is without trying further models. With
+        hedging, results that lose the race (finished alongside the winner
+        or just before being cancelled) are passed to ``discard``.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        hedge_after = self.hedge_after if hedge_after is None else hedge_after
+        queue = self.candidates()
+        if not queue:
+            raise AllModelsFailed(None)
+        pending: dict[asyncio.Task, str] = {}
+        losers: list = []
+        last_error: Optional[BaseException] = None
+
+        def launch():
+            model = queue.pop(0)
+            if pending:
+                self.hedges += 1
+                metrics.LLM_HEDGES.labels(model).inc()
+            elif model != self.models[0]:
+                self.fallbacks += 1
+                metrics.LLM_FALLBACKS.labels(model).inc()
+            # Claim the probe before yielding to the loop so concurrent calls skip the model
+            self._begin(model)
+            pending[asyncio.ensure_future(self._attempt(model, call, timeout))] = model
+
+        try:
+            launch()
+            while pending:
+                wait = hedge_after if hedge_after > 0 and queue else None
+                done, _ = await asyncio.wait(pending, timeout=wait, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    # Hedge: the in-flight call is slow, race it against the next model
+                    launch()
+                    continue
+                winner = None
+                for task in done:
+                    model = pending.pop(task)
+                    error = task.exception()
+                    if error is None:
+                        if winner is None:
+                            winner = (task.result(), model)
+                        else:
+                            losers.append(task.result())
+                    elif not self.transient(error):
+                        raise error
+                    else:
+                        last_error = error
+                if winner is not None:
+                    return winner
+                if not pending and queue:
+                    launch()
+        finally:
+            for task in pending:
+                task.cancel()
+            if discard is not None:
+                # A cancelled attempt may already have finished; its result still needs releasing
+                for outcome in await asyncio.gather(*pending, return_exceptions=True):
+                    if not isinstance(outcome, BaseException):
+                        losers.append(outcome)
+                for result in losers:
+                    await discard(result)
+        raise AllModelsFailed(last_error)
+
+    def stats(self) -> dict:
+        return {
+            "models": {name: health.snapshot() for name, health in self.health.items()},
+            "fallbacks": self.fallbacks,
+            "hedges": self.hedges,
+            "timeout_seconds": self.timeout,
+            "hedge_after_seconds": self.hedge_after,
+        }
@@ -1,6 +1,6 @@
 # backend/app/models.py
 # File path: backend/app/models.py
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, JSON
+from sqlalchemy import BigInteger, Boolean, Column, Float, Integer, String, Date, DateTime, ForeignKey, Text, JSON, Index
 from sqlalchemy.orm import relationship
 from app.database import Base
 import datetime
@@ -20,6 +20,8 @@ class User(Base):
     activity_level = Column(String, nullable=True)
     health_conditions = Column(String, nullable=True)
     profile_picture = Column(String, nullable=True)  # URL to profile picture
+    # Bumped by every write to the user's data; conditional GETs derive their ETags from it
+    data_version = Column(BigInteger, nullable=False, default=0, server_default="0")
 
     activities = relationship("Activity", back_populates="owner", cascade="all, delete-orphan")
     meal_analyses = relationship("MealAnalysis", back_populates="owner", cascade="all, delete-orphan")
@@ -33,9 +35,22 @@ class Activity(Base):
     duration = Column(Integer, nullable=False)
     date = Column(DateTime, default=datetime.datetime.utcnow)
     owner_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    client_key = Column(String, nullable=True)  # idempotency key from offline sync
 
     owner = relationship("User", back_populates="activities")
 
+# Every history query filters on owner_id and sorts on date desc; id breaks ties
+# for keyset pagination (migrations 0002/0003)
+Index("ix_activities_owner_id_date_id", Activity.owner_id, Activity.date.desc(), Activity.id.desc())
+# Replayed offline uploads are deduplicated per user (migration 0004)
+Index(
+    "uq_activities_owner_id_client_key",
+    Activity.owner_id,
+    Activity.client_key,
+    unique=True,
+    postgresql_where=Activity.client_key.isnot(None),
+)
+
 
 class MealAnalysis(Base):
     __tablename__ = "meal_analyses"
@@ -43,7 +58,77 @@ class MealAnalysis(Base):
     id = Column(Integer, primary_key=True, index=True)
     image_uri = Column(String, nullable=True)
     analysis_data = Column(JSON, nullable=False)
+    # Copied out of analysis_data by app.meal_nutrition so summaries aggregate in SQL; NULL when unknown
+    calories = Column(Float, nullable=True)
+    protein_g = Column(Float, nullable=True)
+    carbs_g = Column(Float, nullable=True)
+    fat_g = Column(Float, nullable=True)
     date = Column(DateTime, default=datetime.datetime.utcnow)
     owner_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    # Upload job that produced this row; a reclaimed job reuses it instead of inserting again
+    job_id = Column(Integer, ForeignKey("jobs.id"), nullable=True)
 
     owner = relationship("User", back_populates="meal_analyses")
+
+# Keyset pages and nutrition summaries both range-scan (owner_id, date); the
+# included macro columns let summaries run as index-only scans (migration 0007)
+Index(
+    "ix_meal_analyses_owner_id_date_id",
+    MealAnalysis.owner_id,
+    MealAnalysis.date.desc(),
+    MealAnalysis.id.desc(),
+    postgresql_include=["calories", "protein_g", "carbs_g", "fat_g"],
+)
+# At most one meal analysis per upload job (migration 0010)
+Index(
+    "uq_meal_analyses_job_id",
+    MealAnalysis.job_id,
+    unique=True,
+    postgresql_where=MealAnalysis.job_id.isnot(None),
+)
+
+
+class Job(Base):
+    """Background work item; the table doubles as a durable queue"""
+    __tablename__ = "jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String, nullable=False)
+    payload = Column(JSON, nullable=False)
+    status = Column(String, nullable=False, default="pending", index=True)  # pending, running, done, failed
+    attempts = Column(Integer, nullable=False, default=0)
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+    run_after = Column(DateTime, default=datetime.datetime.utcnow, nullable=False)  # next attempt / lease expiry
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
+    owner_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+
+    owner = relationship("User")
+
+
+# Upload dedup and job status lookups filter on owner_id (migration 0008)
+Index("ix_jobs_owner_id_created_at", Job.owner_id, Job.created_at)
+
+
+class ActivityDaily(Base):
+    """Per-user, per-day activity rollup maintained alongside inserts into activities"""
+    __tablename__ = "activity_daily"
+
+    owner_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    total_minutes = Column(Integer, nullable=False, default=0)
+    activity_count = Column(Integer, nullable=False, default=0)
+
+
+class WellnessScore(Base):
+    """Precomputed wellness score per user, refreshed by app.wellness"""
+    __tablename__ = "wellness_scores"
+
+    owner_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    score = Column(Integer, nullable=False)
+    profile_complete = Column(Boolean, nullable=False)
+    recent_activities_count = Column(Integer, nullable=False)
+    # users.data_version the score was computed from; stale once the user writes again
+    data_version = Column(BigInteger, nullable=False, server_default="0")
+    computed_at = Column(DateTime, nullable=False, default=datetime.datetime.utcnow)
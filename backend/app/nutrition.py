@@ -0,0 +1,250 @@
+# backend/app/nutrition.py
+# File path: backend/app/nutrition.py
+"""Calorie targets and static fallback plans.
+
+The per-user helpers back /plan/generate-plan; the bulk_* functions run the
+same formulas over columnar profile arrays for cohort jobs (coaching
+dashboards, nightly emails). The static plan templates are built once at
+import and shared read-only.
+
+    python -m app.nutrition targets                      # every user in the database
+    python -m app.nutrition targets profiles.csv -o targets.csv
+"""
+import argparse
+import csv
+import sys
+from types import MappingProxyType
+
+import numpy as np
+
+ACTIVITY_MULTIPLIERS = MappingProxyType({
+    "sedentary": 1.2,
+    "light": 1.375,
+    "moderate": 1.55,
+    "very_active": 1.725,
+    "extra_active": 1.9
+})
+DEFAULT_ACTIVITY_MULTIPLIER = 1.55
+
+# Daily calorie adjustment per goal; anything else maintains
+GOAL_CALORIE_DELTAS = MappingProxyType({
+    "lose": -500,  # 500 calorie deficit for weight loss
+    "gain": 300,  # 300 calorie surplus for weight gain
+})
+
+
+def _frozen_plan(days: list[dict]) -> tuple:
+    return tuple(MappingProxyType(day) for day in days)
+
+
+# Mediterranean/Tunisian meal plans by diet preference
+MEAL_PLAN_TEMPLATES = MappingProxyType({
+    "vegan": _frozen_plan([
+        {"day": 1, "breakfast": "Harissa Shakshuka with chickpeas", "lunch": "Couscous with roasted vegetables", "dinner": "Tunisian lentil soup (Chorba)"},
+        {"day": 2, "breakfast": "Olive oil flatbread with zaatar", "lunch": "Stuffed peppers with quinoa", "dinner": "Mechouia salad with chickpeas"},
+        {"day": 3, "breakfast": "Tunisian chickpea stew", "lunch": "Grilled eggplant with tahini", "dinner": "Couscous with seven vegetables"},
+        {"day": 4, "breakfast": "Whole grain msemen with honey", "lunch": "Tunisian vegetable tajine", "dinner": "Lentil salad with harissa dressing"},
+        {"day": 5, "breakfast": "Fresh figs with almonds", "lunch": "Brik with vegetables (no egg)", "dinner": "White bean stew with harissa"},
+        {"day": 6, "breakfast": "Tunisian chickpea soup", "lunch": "Grilled vegetables with couscous", "dinner": "Mechouia with olive oil"},
+        {"day": 7, "breakfast": "Dates with nuts and mint tea", "lunch": "Mediterranean veggie wrap", "dinner": "Tunisian vegetable stew"},
+    ]),
+    "keto": _frozen_plan([
+        {"day": 1, "breakfast": "Tunisian brik with egg and tuna", "lunch": "Grilled sea bass with harissa", "dinner": "Lamb kebabs with mechouia"},
+        {"day": 2, "breakfast": "Shakshuka with merguez", "lunch": "Grilled sardines with olive oil", "dinner": "Lamb tajine with vegetables"},
+        {"day": 3, "breakfast": "Cheese omelette with harissa", "lunch": "Grilled octopus salad", "dinner": "Tunisian grilled chicken"},
+        {"day": 4, "breakfast": "Brik with egg and harissa", "lunch": "Sea bream with lemon", "dinner": "Merguez with mechouia salad"},
+        {"day": 5, "breakfast": "Poached eggs with olive oil", "lunch": "Grilled prawns with garlic", "dinner": "Lamb chops with herbs"},
+        {"day": 6, "breakfast": "Tunisian egg tajine", "lunch": "Grilled tuna steak", "dinner": "Chicken with preserved lemon"},
+        {"day": 7, "breakfast": "Shakshuka with merguez", "lunch": "Mixed seafood grill", "dinner": "Lamb kofta with salad"},
+    ]),
+    "balanced": _frozen_plan([
+        {"day": 1, "breakfast": "Tunisian breakfast with olive oil and eggs", "lunch": "Couscous with chicken and vegetables", "dinner": "Grilled fish with mechouia salad"},
+        {"day": 2, "breakfast": "Brik with egg and tuna", "lunch": "Lamb tajine with prunes", "dinner": "Tunisian chickpea soup"},
+        {"day": 3, "breakfast": "Msemen with honey and almonds", "lunch": "Grilled sea bass with couscous", "dinner": "Vegetable tajine"},
+        {"day": 4, "breakfast": "Shakshuka with bread", "lunch": "Chicken with preserved lemon", "dinner": "Tunisian salad with tuna"},
+        {"day": 5, "breakfast": "Tunisian pastry with dates", "lunch": "Couscous royal (mixed meats)", "dinner": "Grilled sardines with salad"},
+        {"day": 6, "breakfast": "Olive oil flatbread with harissa", "lunch": "Fish tagine with vegetables", "dinner": "Lentil soup with bread"},
+        {"day": 7, "breakfast": "Fresh figs with yogurt", "lunch": "Lamb couscous", "dinner": "Grilled prawns with salad"},
+    ]),
+})
+
+# Weekly workout routines by goal
+WORKOUT_PLAN_TEMPLATES = MappingProxyType({
+    "lose": _frozen_plan([
+        {"day": 1, "workout": "Cardio - 30 min Running", "duration": 30},
+        {"day": 2, "workout": "Strength Training - Full Body", "duration": 45},
+        {"day": 3, "workout": "Cardio - 30 min Cycling", "duration": 30},
+        {"day": 4, "workout": "Strength Training - Upper Body", "duration": 45},
+        {"day": 5, "workout": "Cardio - 30 min Swimming", "duration": 30},
+        {"day": 6, "workout": "Strength Training - Lower Body", "duration": 45},
+        {"day": 7, "workout": "Active Rest - Yoga or Walking", "duration": 20},
+    ]),
+    "gain": _frozen_plan([
+        {"day": 1, "workout": "Strength Training - Chest & Triceps", "duration": 60},
+        {"day": 2, "workout": "Strength Training - Back & Biceps", "duration": 60},
+        {"day": 3, "workout": "Light Cardio - 20 min", "duration": 20},
+        {"day": 4, "workout": "Strength Training - Legs", "duration": 60},
+        {"day": 5, "workout": "Strength Training - Shoulders", "duration": 60},
+        {"day": 6, "workout": "Light Cardio - 20 min", "duration": 20},
+        {"day": 7, "workout": "Rest", "duration": 0},
+    ]),
+    "maintain": _frozen_plan([
+        {"day": 1, "workout": "Full Body Strength Training", "duration": 45},
+        {"day": 2, "workout": "Cardio - 25 min Running", "duration": 25},
+        {"day": 3, "workout": "Full Body Strength Training", "duration": 45},
+        {"day": 4, "workout": "Cardio - 25 min Cycling", "duration": 25},
+        {"day": 5, "workout": "Full Body Strength Training", "duration": 45},
+        {"day": 6, "workout": "Active Rest - Yoga", "duration": 30},
+        {"day": 7, "workout": "Rest", "duration": 0},
+    ]),
+})
+
+
+def calculate_bmr(weight: int, height: int, age: int, gender: str = "male") -> float:
+    """Calculate Basal Metabolic Rate using Mifflin-St Jeor Equation"""
+    if gender == "male":
+        return 10 * weight + 6.25 * height - 5 * age + 5
+    else:
+        return 10 * weight + 6.25 * height - 5 * age - 161
+
+
+def calculate_tdee(bmr: float, activity_level: str) -> int:
+    """Calculate Total Daily Energy Expenditure"""
+    return int(bmr * ACTIVITY_MULTIPLIERS.get(activity_level, DEFAULT_ACTIVITY_MULTIPLIER))
+
+
+def adjust_calories_for_goal(tdee: int, goal: str) -> int:
+    """Adjust calories based on user's goal"""
+    return tdee + GOAL_CALORIE_DELTAS.get(goal, 0)
+
+
+def meal_plan_key(diet: str) -> str:
+    return diet if diet in MEAL_PLAN_TEMPLATES else "balanced"
+
+
+def workout_plan_key(goal: str) -> str:
+    return goal if goal in WORKOUT_PLAN_TEMPLATES else "maintain"
+
+
+def generate_meal_plan_by_diet(diet: str, goal: str):
+    """Mediterranean/Tunisian meal plan for a diet preference (shared, read-only)"""
+    return MEAL_PLAN_TEMPLATES[meal_plan_key(diet)]
+
+
+def generate_workout_plan(activity_level: str, goal: str):
+    """Workout routine for a goal (shared, read-only)"""
+    return WORKOUT_PLAN_TEMPLATES[workout_plan_key(goal)]
+
+
+def _lookup(column, table, default) -> np.ndarray:
+    """Map a categorical column through a small dict with one vectorized compare per key"""
+    values = np.asarray(column, dtype=object)
+    result = np.full(values.shape, default, dtype=np.asarray([default, *table.values()]).dtype)
+    for key, value in table.items():
+        result[values == key] = value
+    return result
+
+
+def bulk_bmr(weight, height, age, gender=None) -> np.ndarray:
+    """calculate_bmr over arrays; gender defaults to male like the per-user helper"""
+    weight = np.asarray(weight, dtype=np.float64)
+    height = np.asarray(height, dtype=np.float64)
+    age = np.asarray(age, dtype=np.float64)
+    offset = 5.0 if gender is None else _lookup(gender, {"male": 5.0}, -161.0)
+    return 10 * weight + 6.25 * height - 5 * age + offset
+
+
+def bulk_targets(weight, height, age, activity_level, goal, gender=None) -> dict[str, np.ndarray]:
+    """BMR, TDEE and daily calorie target for every row of a profile column set.
+
+    activity_level and goal hold the same strings as users.activity_level /
+    users.goal; missing values take the endpoint defaults (moderate/maintain).
+    """
+    bmr = bulk_bmr(weight, height, age, gender)
+    multipliers = _lookup(activity_level, ACTIVITY_MULTIPLIERS, DEFAULT_ACTIVITY_MULTIPLIER)
+    # int() truncates toward zero, as does the cast
+    tdee = (bmr * multipliers).astype(np.int64)
+    daily_calories = tdee + _lookup(goal, GOAL_CALORIE_DELTAS, 0).astype(np.int64)
+    return {"bmr": bmr, "tdee": tdee, "daily_calories": daily_calories}
+
+
+def bulk_plan_keys(diet, goal) -> dict[str, np.ndarray]:
+    """Template key per row into MEAL_PLAN_TEMPLATES / WORKOUT_PLAN_TEMPLATES"""
+    return {
+        "meal_plan": _lookup(diet, {key: key for key in MEAL_PLAN_TEMPLATES}, "balanced"),
+        "workout_plan": _lookup(goal, {key: key for key in WORKOUT_PLAN_TEMPLATES}, "maintain"),
+    }
+
+
+def bulk_plans(weight, height, age, activity_level, goal, diet, gender=None) -> dict[str, np.ndarray]:
+    """bulk_targets plus the static plan template keys, all as columns"""
+    return {
+        **bulk_targets(weight, height, age, activity_level, goal, gender),
+        **bulk_plan_keys(diet, goal),
+    }
+
+
+PROFILE_COLUMNS = ("id", "weight", "height", "age", "activity_level", "goal", "diet")
+OUTPUT_COLUMNS = ("id", "bmr", "tdee", "daily_calories", "meal_plan", "workout_plan")
+
+PROFILES_SQL = """
+SELECT id, weight, height, age, activity_level, goal, diet
+FROM users
+WHERE age IS NOT NULL AND weight IS NOT NULL AND height IS NOT NULL
+ORDER BY id
+"""
+
+
+def _columns(rows) -> dict[str, list]:
+    """Transpose profile rows into PROFILE_COLUMNS lists"""
+    columns = {name: [] for name in PROFILE_COLUMNS}
+    for row in rows:
+        for name, value in zip(PROFILE_COLUMNS, row):
+            columns[name].append(value)
+    return columns
+
+
+def _load_csv(path: str) -> dict[str, list]:
+    with open(path, newline="") as f:
+        reader = csv.DictReader(f)
+        rows = [tuple(row.get(name) or None for name in PROFILE_COLUMNS) for row in reader]
+    return _columns(rows)
+
+
+def _load_users() -> dict[str, list]:
+    from sqlalchemy import text
+
+    from app.database import engine
+
+    with engine.connect() as conn:
+        return _columns(conn.execute(text(PROFILES_SQL)).fetchall())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m app.nutrition", description="Bulk calorie targets and plan templates")
+    sub = parser.add_subparsers(dest="command", required=True)
+    targets = sub.add_parser("targets", help="compute targets for a CSV of profiles or every user")
+    targets.add_argument("profiles", nargs="?", help=f"CSV with columns {','.join(PROFILE_COLUMNS)} (default: users table)")
+    targets.add_argument("-o", "--output", help="write CSV here instead of stdout")
+    args = parser.parse_args(argv)
+
+    columns = _load_csv(args.profiles) if args.profiles else _load_users()
+    result = bulk_plans(
+        columns["weight"], columns["height"], columns["age"],
+        columns["activity_level"], columns["goal"], columns["diet"],
+    )
+    result["id"] = np.asarray(columns["id"], dtype=object)
+    result["bmr"] = result["bmr"].astype(np.int64)
+
+    out = open(args.output, "w", newline="") if args.output else sys.stdout
+    try:
+        writer = csv.writer(out)
+        writer.writerow(OUTPUT_COLUMNS)
+        writer.writerows(zip(*(result[name].tolist() for name in OUTPUT_COLUMNS)))
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
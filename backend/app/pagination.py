@@ -0,0 +1,71 @@
+# backend/app/pagination.py
+# File path: backend/app/pagination.py
+import base64
+from datetime import datetime, timezone
+from typing import Optional, Sequence
+
+from fastapi import HTTPException
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Server-side cap on client-chosen page sizes
+MAX_PAGE_SIZE = 100
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def _naive_utc(value: datetime) -> datetime:
+    # Columns are naive UTC timestamps; asyncpg refuses to compare them with aware values
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def encode_cursor(date: datetime, row_id: int) -> str:
+    raw = f"{date.isoformat()}|{row_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        date, row_id = base64.urlsafe_b64decode(padded).decode("utf-8").split("|")
+        return _naive_utc(datetime.fromisoformat(date)), int(row_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+async def keyset_page(
+    db: AsyncSession,
+    model,
+    owner_id: int,
+    limit: int,
+    cursor: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    columns: Optional[Sequence] = None,
+):
+    """One page of a user's rows, newest first, plus the cursor for the next page.
+
+    Seeks on (date, id) instead of using OFFSET, so with the
+    (owner_id, date DESC, id DESC) index every page is a short index range scan.
+    With ``columns`` (which must include date and id) the page is plain result
+    rows of just those columns instead of ORM entities.
+    """
+    query = (select(*columns) if columns else select(model)).where(model.owner_id == owner_id)
+    if cursor:
+        cursor_date, cursor_id = decode_cursor(cursor)
+        query = query.where(tuple_(model.date, model.id) < tuple_(cursor_date, cursor_id))
+    if since:
+        query = query.where(model.date >= _naive_utc(since))
+    if until:
+        query = query.where(model.date < _naive_utc(until))
+    query = query.order_by(model.date.desc(), model.id.desc()).limit(limit + 1)
+
+    result = await db.execute(query)
+    items = result.all() if columns else result.scalars().all()
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        next_cursor = encode_cursor(items[-1].date, items[-1].id)
+    return items, next_cursor
@@ -0,0 +1,30 @@
+# backend/app/plan_cache.py
+# File path: backend/app/plan_cache.py
+"""Cache of AI-generated plans, keyed on the profile fields that shape the prompt.
+
+/plan/generate-plan reads and fills it; profile updates that change one of
+PLAN_PROFILE_FIELDS drop the user's entry.
+"""
+import hashlib
+import json
+
+from app import models
+from app.cache import create_cache
+from app.nutrition import adjust_calories_for_goal, calculate_bmr, calculate_tdee
+
+plan_cache = create_cache("plan", maxsize=2048, ttl=24 * 3600)
+
+PLAN_PROFILE_FIELDS = ("age", "weight", "height", "goal", "diet", "activity_level", "health_conditions")
+
+
+def plan_cache_key(user: models.User) -> str | None:
+    """Cache key for a user's AI plan, or None if the profile can't produce one"""
+    if not all([user.age, user.weight, user.height]):
+        return None
+    bmr = calculate_bmr(user.weight, user.height, user.age)
+    tdee = calculate_tdee(bmr, user.activity_level or "moderate")
+    daily_calories = adjust_calories_for_goal(tdee, user.goal or "maintain")
+    profile = {field: getattr(user, field) for field in PLAN_PROFILE_FIELDS}
+    profile["daily_calories"] = daily_calories
+    fingerprint = hashlib.sha256(json.dumps(profile, sort_keys=True).encode("utf-8")).hexdigest()
+    return f"{user.id}:{fingerprint}"
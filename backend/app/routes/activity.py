@@ -1,100 +1,217 @@
 # backend/app/routes/activity.py
 # File path: backend/app/routes/activity.py
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models import User, Activity, MealAnalysis
-from app.schemas.activity import ActivityResponse as ActivitySchema, ActivityCreate
-from app.schemas.meal_analysis import MealAnalysisCreate, MealAnalysisResponse
-from app.database import get_db
+from app.schemas.activity import ActivityResponse as ActivitySchema, ActivityCreate, ActivityBatchCreate, ActivityBatchResponse
+from app.schemas.meal_analysis import (
+    NUTRITION_SUMMARY_MAX_DAYS, MealAnalysisCreate, MealAnalysisResponse, NutritionSummaryResponse,
+)
+from app.database import get_db, get_read_db
 from app.auth_utils import get_current_user
-from datetime import datetime, timedelta
+from app.aggregates import CALORIES_PER_MINUTE, add_to_daily_rollup, current_streak, weekly_totals
+from app.pagination import MAX_PAGE_SIZE, NEXT_CURSOR_HEADER, keyset_page
+from app.responses import rows_response
+from app import wellness
+from app.meal_nutrition import MACRO_FIELDS, extract_macros, nutrition_summary_query
+from app.http_cache import bump_data_version
+from datetime import datetime, timedelta, timezone
+from collections import defaultdict
+from typing import Optional
 
 router = APIRouter()
 
+# History pages are serialized straight from these columns (see app.responses);
+# keep them in step with ActivitySchema / MealAnalysisResponse
+ACTIVITY_COLUMNS = (Activity.id, Activity.owner_id, Activity.activity, Activity.duration, Activity.date)
+MEAL_ANALYSIS_COLUMNS = (
+    MealAnalysis.id, MealAnalysis.owner_id, MealAnalysis.image_uri, MealAnalysis.analysis_data, MealAnalysis.date,
+    *(getattr(MealAnalysis, field) for field in MACRO_FIELDS),
+)
+
 @router.post("/track-activity", response_model=ActivitySchema)
 async def track_activity(
     activity: ActivityCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     db_activity = Activity(
         activity=activity.activity,
         duration=activity.duration,
+        date=datetime.utcnow(),
         owner_id=current_user.id
     )
     db.add(db_activity)
-    db.commit()
-    db.refresh(db_activity)
+    await add_to_daily_rollup(db, [(current_user.id, db_activity.date.date(), activity.duration, 1)])
+    await wellness.invalidate(db, current_user.id)
+    await bump_data_version(db, current_user.id)
+    await db.commit()
+    await db.refresh(db_activity)
     return db_activity
 
+@router.post("/track-activities/batch", response_model=ActivityBatchResponse)
+async def track_activities_batch(
+    batch: ActivityBatchCreate,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Ingest queued offline workouts in one transaction; replays are skipped by idempotency key"""
+    now = datetime.utcnow()
+    rows = {}
+    for item in batch.activities:
+        date = item.date or now
+        if date.tzinfo is not None:
+            date = date.astimezone(timezone.utc).replace(tzinfo=None)
+        # Last occurrence wins if the client repeats a key inside one batch
+        rows[item.idempotency_key] = {
+            "activity": item.activity,
+            "duration": item.duration,
+            "date": date,
+            "owner_id": current_user.id,
+            "client_key": item.idempotency_key,
+        }
+
+    # One multi-row INSERT ... ON CONFLICT DO NOTHING RETURNING: only new rows come back
+    stmt = (
+        pg_insert(Activity)
+        .values(list(rows.values()))
+        .on_conflict_do_nothing(
+            index_elements=[Activity.owner_id, Activity.client_key],
+            index_where=Activity.client_key.isnot(None),
+        )
+        .returning(Activity)
+    )
+    created = (await db.scalars(stmt)).all()
+
+    rollup = defaultdict(lambda: [0, 0])
+    for row in created:
+        totals = rollup[row.date.date()]
+        totals[0] += row.duration
+        totals[1] += 1
+    await add_to_daily_rollup(
+        db, [(current_user.id, day, minutes, count) for day, (minutes, count) in rollup.items()]
+    )
+    if created:
+        await wellness.invalidate(db, current_user.id)
+        await bump_data_version(db, current_user.id)
+
+    created_keys = {row.client_key for row in created}
+    duplicate_keys = [key for key in rows if key not in created_keys]
+    existing = []
+    if duplicate_keys:
+        result = await db.execute(
+            select(Activity).where(
+                Activity.owner_id == current_user.id,
+                Activity.client_key.in_(duplicate_keys)
+            )
+        )
+        existing = result.scalars().all()
+
+    await db.commit()
+    return {
+        "created": len(created),
+        "duplicates": len(duplicate_keys),
+        "activities": sorted([*created, *existing], key=lambda row: (row.date, row.id)),
+    }
+
 @router.get("/recent", response_model=list[ActivitySchema])
 async def recent_activities(
+    limit: int = Query(10, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    items = db.query(Activity).filter(Activity.owner_id == current_user.id).order_by(Activity.date.desc()).limit(10).all()
-    return items
+    # Older pages: pass back the X-Next-Cursor header value as ?cursor=
+    items, next_cursor = await keyset_page(
+        db, Activity, current_user.id, limit, cursor, since, until, columns=ACTIVITY_COLUMNS
+    )
+    return rows_response(items, headers={NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None)
 
 @router.post("/meal-analysis", response_model=MealAnalysisResponse)
 async def save_meal_analysis(
     meal: MealAnalysisCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     db_analysis = MealAnalysis(
         image_uri=meal.image_uri,
         analysis_data=meal.analysis,
-        owner_id=current_user.id
+        owner_id=current_user.id,
+        **extract_macros(meal.analysis)
     )
     db.add(db_analysis)
-    db.commit()
-    db.refresh(db_analysis)
+    await bump_data_version(db, current_user.id)
+    await db.commit()
+    await db.refresh(db_analysis)
     return db_analysis
 
 @router.get("/meal-insights", response_model=list[MealAnalysisResponse])
 async def meal_insights(
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    items, next_cursor = await keyset_page(
+        db, MealAnalysis, current_user.id, limit, cursor, since, until, columns=MEAL_ANALYSIS_COLUMNS
+    )
+    return rows_response(items, headers={NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None)
+
+@router.get("/nutrition-summary", response_model=NutritionSummaryResponse)
+async def nutrition_summary(
+    days: int = Query(7, ge=1, le=NUTRITION_SUMMARY_MAX_DAYS),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    items = db.query(MealAnalysis).filter(MealAnalysis.owner_id == current_user.id).order_by(MealAnalysis.date.desc()).limit(20).all()
-    return items
+    """Meals and macros per UTC day (zero-filled), per ISO week and in total over the last ``days`` days.
+
+    Aggregated in SQL from the typed nutrition columns; meals without
+    nutrition data count as meals but add nothing to the sums. The first
+    week may be partial.
+    """
+    today = datetime.utcnow().date()
+    first_day = today - timedelta(days=days - 1)
+    start = datetime.combine(first_day, datetime.min.time())
+    end = datetime.combine(today + timedelta(days=1), datetime.min.time())
+    result = await db.execute(nutrition_summary_query(current_user.id, start, end))
+
+    empty = dict(meals=0, **dict.fromkeys(MACRO_FIELDS, 0.0))
+    by_day, weeks, totals = {}, [], empty
+    for row in result:
+        values = {"meals": row.meals, **{field: round(getattr(row, field), 1) for field in MACRO_FIELDS}}
+        if row.day is not None:
+            by_day[row.day] = values
+        elif row.week_start is not None:
+            weeks.append({"week_start": row.week_start, **values})
+        else:
+            totals = values
+
+    return {
+        "days": [
+            {"day": day, **by_day.get(day, empty)}
+            for day in (first_day + timedelta(days=offset) for offset in range(days))
+        ],
+        "weeks": sorted(weeks, key=lambda week: week["week_start"]),
+        "totals": totals,
+    }
 
 @router.get("/stats")
 async def activity_stats(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    # Last 7 days
-    week_ago = datetime.utcnow() - timedelta(days=7)
-    activities = db.query(Activity).filter(
-        Activity.owner_id == current_user.id,
-        Activity.date >= week_ago
-    ).all()
-    
-    total_minutes = sum(a.duration for a in activities)
-    total_activities = len(activities)
-    # Rough estimate: ~5-7 cal/min for moderate activity
-    calories_burned = total_minutes * 6
-    
-    # Calculate streak
-    all_activities = db.query(Activity).filter(
-        Activity.owner_id == current_user.id
-    ).order_by(Activity.date.desc()).all()
-    
-    streak = 0
-    if all_activities:
-        current_date = datetime.utcnow().date()
-        for activity in all_activities:
-            activity_date = activity.date.date()
-            days_diff = (current_date - activity_date).days
-            if days_diff == 0 or days_diff == 1:
-                if activity_date < current_date:
-                    current_date = activity_date
-                streak += 1
-            else:
-                break
-    
+    # Served from the activity_daily rollup, so cost doesn't grow with history
+    today = datetime.utcnow().date()
+    total_minutes, total_activities = await weekly_totals(db, current_user.id, today)
+    calories_burned = total_minutes * CALORIES_PER_MINUTE
+    streak = await current_streak(db, current_user.id, today)
+
     return {
         "totalMinutes": total_minutes,
         "totalActivities": total_activities,
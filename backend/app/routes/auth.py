@@ -1,17 +1,23 @@
 # backend/app/routes/auth.py
 # File path: backend/app/routes/auth.py
 from fastapi import APIRouter, Depends, HTTPException, status, File, UploadFile
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models import User
 from app.schemas import UserCreate, Token, UserProfileUpdate, UserResponse
 from app.database import get_db
-from app.auth_utils import get_password_hash, verify_password, create_access_token, get_current_user
+from app.auth_utils import (
+    get_password_hash_async, verify_password_async, password_needs_rehash,
+    create_access_token, get_current_user_fresh, get_current_user_orm, invalidate_cached_user,
+)
+from app.plan_cache import plan_cache, plan_cache_key, PLAN_PROFILE_FIELDS
+from app.storage import put_stream
+from app import storage, wellness
+from app.http_cache import bump_data_version
 from datetime import timedelta
 from dotenv import load_dotenv
-from minio import Minio
-import os
-import io
 
 load_dotenv()
 
@@ -19,35 +25,16 @@ router = APIRouter()
 
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
-# MinIO configuration
-MINIO_ENDPOINT = os.getenv("MINIO_ENDPOINT")
-MINIO_ACCESS_KEY = os.getenv("MINIO_ACCESS_KEY")
-MINIO_SECRET_KEY = os.getenv("MINIO_SECRET_KEY")
-MINIO_BUCKET = os.getenv("MINIO_BUCKET")
-MINIO_PUBLIC_ENDPOINT = os.getenv("MINIO_PUBLIC_ENDPOINT")
-
-if all([MINIO_ENDPOINT, MINIO_ACCESS_KEY, MINIO_SECRET_KEY, MINIO_BUCKET]):
-    minio_client = Minio(
-        str(MINIO_ENDPOINT),
-        access_key=MINIO_ACCESS_KEY,
-        secret_key=MINIO_SECRET_KEY,
-        secure=False
-    )
-    if not minio_client.bucket_exists(MINIO_BUCKET):
-        minio_client.make_bucket(MINIO_BUCKET)
-else:
-    minio_client = None
-
 @router.post("/register", response_model=Token)  # ← FIXED
-async def register_user(user: UserCreate, db: Session = Depends(get_db)):
-    db_user = db.query(User).filter(User.email == user.email).first()
-    if db_user:
+async def register_user(user: UserCreate, db: AsyncSession = Depends(get_db)):
+    result = await db.execute(select(User).where(User.email == user.email))
+    if result.scalars().first():
         raise HTTPException(status_code=400, detail="Email already registered")
-    db_user = db.query(User).filter(User.username == user.username).first()
-    if db_user:
+    result = await db.execute(select(User).where(User.username == user.username))
+    if result.scalars().first():
         raise HTTPException(status_code=400, detail="Username already taken")
 
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await get_password_hash_async(user.password)
     db_user = User(
         username=user.username,
         email=user.email,
@@ -61,8 +48,8 @@ async def register_user(user: UserCreate, db: Session = Depends(get_db)):
         health_conditions=user.health_conditions
     )
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
 
     access_token = create_access_token(
         data={"sub": db_user.email},
@@ -83,7 +70,7 @@ async def register_user(user: UserCreate, db: Session = Depends(get_db)):
 @router.post("/login", response_model=Token)
 async def login_for_access_token(
     credentials: dict,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     username = credentials.get("username")
     password = credentials.get("password")
@@ -91,13 +78,19 @@ async def login_for_access_token(
     if not username or not password:
         raise HTTPException(status_code=400, detail="Username and password required")
     
-    user = db.query(User).filter(User.email == username).first()
-    if not user or not verify_password(password, user.hashed_password):
+    result = await db.execute(select(User).where(User.email == username))
+    user = result.scalars().first()
+    if not user or not await verify_password_async(password, user.hashed_password):
         raise HTTPException(
             status_code=401, 
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"}
         )
+
+    # Cost factor changed since this hash was made: upgrade it while we have the plaintext
+    if password_needs_rehash(user.hashed_password):
+        user.hashed_password = await get_password_hash_async(password)
+        await db.commit()
     
     access_token = create_access_token(
         data={"sub": user.email},
@@ -118,19 +111,30 @@ async def login_for_access_token(
 @router.post("/update-profile", response_model=UserResponse)
 async def update_user_profile(
     profile: UserProfileUpdate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_orm),
+    db: AsyncSession = Depends(get_db)
 ):
-    for field, value in profile.dict(exclude_unset=True).items():
+    updates = profile.dict(exclude_unset=True)
+    old_plan_key = plan_cache_key(current_user)
+    plan_fields_changed = any(
+        field in PLAN_PROFILE_FIELDS and getattr(current_user, field) != value
+        for field, value in updates.items()
+    )
+    for field, value in updates.items():
         setattr(current_user, field, value)
-    db.commit()
-    db.refresh(current_user)
+    await wellness.invalidate(db, current_user.id)
+    await bump_data_version(db, current_user.id)
+    await db.commit()
+    await invalidate_cached_user(current_user.email)
+    if plan_fields_changed and old_plan_key:
+        await plan_cache.delete(old_plan_key)
+    await db.refresh(current_user)
     return current_user
 
 
 @router.get("/me", response_model=UserResponse)
 async def get_current_user_profile(
-    current_user: User = Depends(get_current_user)
+    current_user: UserResponse = Depends(get_current_user_fresh)
 ):
     return current_user
 
@@ -138,32 +142,33 @@ async def get_current_user_profile(
 @router.post("/upload-profile-picture")
 async def upload_profile_picture(
     file: UploadFile = File(...),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_orm),
+    db: AsyncSession = Depends(get_db)
 ):
-    if not minio_client:
+    if not storage.is_configured():
         raise HTTPException(status_code=500, detail="Storage service not configured")
     
     try:
-        content = await file.read()
-        buffer = io.BytesIO(content)
         object_name = f"profile_{current_user.id}_{file.filename}"
         
-        minio_client.put_object(
-            str(MINIO_BUCKET),
+        await run_in_threadpool(
+            put_stream,
+            storage.get_client(),
+            str(storage.MINIO_BUCKET),
             object_name,
-            buffer,
-            length=len(content),
-            content_type=file.content_type or "image/jpeg"
+            file.file,
+            file.content_type or "image/jpeg",
+            "profile_picture"
         )
         
-        public_endpoint = MINIO_PUBLIC_ENDPOINT or MINIO_ENDPOINT
-        url = f"http://{public_endpoint}/{MINIO_BUCKET}/{object_name}"
+        url = storage.public_url(object_name)
         
         # Update user profile
         current_user.profile_picture = url
-        db.commit()
-        db.refresh(current_user)
+        await bump_data_version(db, current_user.id)
+        await db.commit()
+        await invalidate_cached_user(current_user.email)
+        await db.refresh(current_user)
         
         return {"profile_picture": url}
     except Exception as e:
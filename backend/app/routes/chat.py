@@ -1,80 +1,122 @@
 # backend/app/routes/chat.py
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from app.auth_utils import get_current_user
 from app.models import User
-import os
-
-try:
-    from google import genai
-except ImportError:
-    genai = None
+from app import ai_client
+import json
+import logging
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
 class ChatMessage(BaseModel):
     message: str
     history: list[dict] = []
 
+
+def build_prompt(chat: ChatMessage) -> str:
+    # System prompt
+    system_prompt = (
+        "You are a helpful health and fitness assistant. Provide concise, "
+        "friendly advice about nutrition, exercise, wellness, and healthy habits. "
+        "Keep responses brief and actionable. Be encouraging and supportive."
+    )
+
+    # Build conversation history
+    conversation_parts = []
+    for msg in chat.history[-10:]:
+        if msg["role"] == "user":
+            conversation_parts.append(f"User: {msg['content']}")
+        elif msg["role"] == "assistant":
+            conversation_parts.append(f"Assistant: {msg['content']}")
+
+    # Add current message
+    conversation_parts.append(f"User: {chat.message}")
+
+    # Combine system prompt with conversation
+    return f"{system_prompt}\n\n" + "\n".join(conversation_parts) + "\n\nAssistant:"
+
+
+def check_ai_configured():
+    missing = ai_client.missing_dependencies()
+
+    if "Gemini SDK" in missing:
+        raise HTTPException(status_code=500, detail="Google GenAI SDK not available")
+
+    if "GEMINI_API_KEY" in missing:
+        raise HTTPException(status_code=500, detail="GEMINI_API_KEY not configured")
+
+
+def sse_event(data: dict, event: str | None = None) -> str:
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data, ensure_ascii=False)}\n\n"
+
 @router.post("/message")
 async def chat_message(
     chat: ChatMessage,
     current_user: User = Depends(get_current_user)
 ):
-    api_key = os.getenv("GEMINI_API_KEY")
-
-    if not genai:
-        raise HTTPException(status_code=500, detail="Google GenAI SDK not available")
-
-    if not api_key:
-        raise HTTPException(status_code=500, detail="GEMINI_API_KEY not configured")
+    check_ai_configured()
 
     try:
-        # Initialize client
-        client = genai.Client(api_key=api_key)
-
-        # System prompt
-        system_prompt = (
-            "You are a helpful health and fitness assistant. Provide concise, "
-            "friendly advice about nutrition, exercise, wellness, and healthy habits. "
-            "Keep responses brief and actionable. Be encouraging and supportive."
-        )
-
-        # Build conversation history
-        conversation_parts = []
-        for msg in chat.history[-10:]:
-            if msg["role"] == "user":
-                conversation_parts.append(f"User: {msg['content']}")
-            elif msg["role"] == "assistant":
-                conversation_parts.append(f"Assistant: {msg['content']}")
-
-        # Add current message
-        conversation_parts.append(f"User: {chat.message}")
-
-        # Combine system prompt with conversation
-        full_prompt = f"{system_prompt}\n\n" + "\n".join(conversation_parts) + "\n\nAssistant:"
-
-        # Try models in order
-        models_to_try = ["gemini-2.0-flash", "gemini-1.5-flash", "gemini-1.5-pro"]
-        
-        last_error = None
-        for model_name in models_to_try:
-            try:
-                response = client.models.generate_content(
-                    model=model_name,
-                    contents=full_prompt
-                )
-                response_text = response.text
-                print(f"Successfully used model: {model_name}")
-                return {"response": response_text}
-            except Exception as model_error:
-                last_error = model_error
-                print(f"Model {model_name} failed: {str(model_error)}")
-                continue
-        
-        # If all models failed
-        raise last_error if last_error else Exception("All models failed")
+        full_prompt = build_prompt(chat)
+
+        response, model_name = await ai_client.generate(full_prompt)
+        logger.info("Chat reply generated", extra={"model": model_name})
+        return {"response": response.text}
 
     except Exception as e:
-        print(f"Chat error: {str(e)}")
+        logger.exception("Chat failed")
         raise HTTPException(status_code=500, detail=f"Chat failed: {str(e)}")
+
+
+
+@router.get("/model-stats")
+async def model_stats(
+    current_user: User = Depends(get_current_user)
+):
+    """Breaker state, latency and error rates for each Gemini model"""
+    return ai_client.router.stats()
+
+
+@router.post("/stream")
+async def chat_stream(
+    chat: ChatMessage,
+    current_user: User = Depends(get_current_user)
+):
+    """Stream the assistant reply as Server-Sent Events while it is generated"""
+    if not ai_client.GEMINI_FAKE_MODEL:
+        check_ai_configured()
+
+    full_prompt = build_prompt(chat)
+
+    async def event_stream():
+        try:
+            first, stream, model_name = await ai_client.open_stream(full_prompt)
+        except Exception as e:
+            logger.warning("Chat stream failed", extra={"error": str(e)})
+            yield sse_event({"detail": f"Chat failed: {str(e)}"}, event="error")
+            return
+
+        try:
+            if first is not None:
+                yield sse_event({"token": first})
+            async for chunk in stream:
+                yield sse_event({"token": chunk})
+        except Exception as e:
+            # Tokens already reached the client, so falling back would garble the reply
+            logger.warning("Chat stream failed", extra={"model": model_name, "error": str(e)})
+            yield sse_event({"detail": f"Chat failed: {str(e)}"}, event="error")
+            return
+        finally:
+            await stream.aclose()
+        logger.info("Chat reply streamed", extra={"model": model_name})
+        yield sse_event({"model": model_name}, event="done")
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,73 @@
+# backend/app/routes/dashboard.py
+# File path: backend/app/routes/dashboard.py
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, Query, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import wellness
+from app.aggregates import CALORIES_PER_MINUTE, current_streak_query, weekly_totals_query
+from app.auth_utils import get_current_user_fresh
+from app.database import AsyncSessionLocal, get_read_db
+from app.models import Activity, WellnessScore
+from app.pagination import MAX_PAGE_SIZE, NEXT_CURSOR_HEADER, keyset_page
+from app.schemas.dashboard import DashboardResponse
+from app.schemas.user import UserResponse
+
+router = APIRouter()
+
+
+def summary_query(owner_id: int, today):
+    """Weekly totals, streak and stored wellness score in one statement"""
+    week = weekly_totals_query(owner_id, today).subquery("week")
+    return select(
+        week.c.total_minutes,
+        week.c.activity_count,
+        current_streak_query(owner_id, today).scalar_subquery().label("streak"),
+        WellnessScore.score,
+        WellnessScore.profile_complete,
+        WellnessScore.recent_activities_count,
+        WellnessScore.computed_at,
+    ).select_from(week).outerjoin(WellnessScore, wellness.current_score(owner_id))
+
+
+@router.get("", response_model=DashboardResponse)
+async def get_dashboard(
+    response: Response,
+    limit: int = Query(10, ge=1, le=MAX_PAGE_SIZE),
+    current_user: UserResponse = Depends(get_current_user_fresh),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Home screen in one call: profile, weekly stats, recent activities and wellness score.
+
+    Two statements on the read session (summary + first page of activities)
+    instead of four requests. ETags and 304s come from ConditionalGetMiddleware.
+    """
+    today = datetime.utcnow().date()
+    summary = (await db.execute(summary_query(current_user.id, today))).one()
+    recent, next_cursor = await keyset_page(db, Activity, current_user.id, limit)
+
+    score = summary
+    if summary.computed_at is None or summary.computed_at.date() < today:
+        # Same rule as /plan/wellness-score: recompute and store on the primary
+        async with AsyncSessionLocal() as primary:
+            score = await wellness.refresh_user(primary, current_user.id)
+
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return DashboardResponse(
+        user=current_user,
+        stats={
+            "totalMinutes": summary.total_minutes,
+            "totalActivities": summary.activity_count,
+            "caloriesBurned": summary.total_minutes * CALORIES_PER_MINUTE,
+            "streak": summary.streak,
+        },
+        recent=recent,
+        wellness={
+            "wellness_score": score.score,
+            "profile_complete": score.profile_complete,
+            "recent_activities_count": score.recent_activities_count,
+        },
+    )
@@ -1,121 +1,35 @@
 # backend/app/routes/plan.py
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app import models, schemas
-from app.database import get_db
+from app.database import AsyncSessionLocal, get_db, get_read_db
 from app.auth_utils import get_current_user
-import os
-
-try:
-    from google import genai
-except ImportError:
-    genai = None
+from app import ai_client, structured_output, wellness
+from app.plan_cache import plan_cache, plan_cache_key
+from app.responses import FastJSONResponse
+from app.schemas.ai import PlanOutput, RecipeOutput
+from app.nutrition import (
+    MEAL_PLAN_TEMPLATES,
+    WORKOUT_PLAN_TEMPLATES,
+    adjust_calories_for_goal,
+    bulk_plans,
+    calculate_bmr,
+    calculate_tdee,
+    generate_meal_plan_by_diet,
+    generate_workout_plan,
+)
+from datetime import datetime
+import logging
 
 router = APIRouter()
-
-
-def calculate_bmr(weight: int, height: int, age: int, gender: str = "male") -> float:
-    """Calculate Basal Metabolic Rate using Mifflin-St Jeor Equation"""
-    if gender == "male":
-        return 10 * weight + 6.25 * height - 5 * age + 5
-    else:
-        return 10 * weight + 6.25 * height - 5 * age - 161
-
-
-def calculate_tdee(bmr: float, activity_level: str) -> int:
-    """Calculate Total Daily Energy Expenditure"""
-    multipliers = {
-        "sedentary": 1.2,
-        "light": 1.375,
-        "moderate": 1.55,
-        "very_active": 1.725,
-        "extra_active": 1.9
-    }
-    return int(bmr * multipliers.get(activity_level, 1.55))
-
-
-def adjust_calories_for_goal(tdee: int, goal: str) -> int:
-    """Adjust calories based on user's goal"""
-    if goal == "lose":
-        return tdee - 500  # 500 calorie deficit for weight loss
-    elif goal == "gain":
-        return tdee + 300  # 300 calorie surplus for weight gain
-    else:
-        return tdee  # maintain
-
-
-def generate_meal_plan_by_diet(diet: str, goal: str):
-    """Generate Mediterranean/Tunisian meal plan based on diet preference"""
-    meal_plans = {
-        "vegan": [
-            {"day": 1, "breakfast": "Harissa Shakshuka with chickpeas", "lunch": "Couscous with roasted vegetables", "dinner": "Tunisian lentil soup (Chorba)"},
-            {"day": 2, "breakfast": "Olive oil flatbread with zaatar", "lunch": "Stuffed peppers with quinoa", "dinner": "Mechouia salad with chickpeas"},
-            {"day": 3, "breakfast": "Tunisian chickpea stew", "lunch": "Grilled eggplant with tahini", "dinner": "Couscous with seven vegetables"},
-            {"day": 4, "breakfast": "Whole grain msemen with honey", "lunch": "Tunisian vegetable tajine", "dinner": "Lentil salad with harissa dressing"},
-            {"day": 5, "breakfast": "Fresh figs with almonds", "lunch": "Brik with vegetables (no egg)", "dinner": "White bean stew with harissa"},
-            {"day": 6, "breakfast": "Tunisian chickpea soup", "lunch": "Grilled vegetables with couscous", "dinner": "Mechouia with olive oil"},
-            {"day": 7, "breakfast": "Dates with nuts and mint tea", "lunch": "Mediterranean veggie wrap", "dinner": "Tunisian vegetable stew"},
-        ],
-        "keto": [
-            {"day": 1, "breakfast": "Tunisian brik with egg and tuna", "lunch": "Grilled sea bass with harissa", "dinner": "Lamb kebabs with mechouia"},
-            {"day": 2, "breakfast": "Shakshuka with merguez", "lunch": "Grilled sardines with olive oil", "dinner": "Lamb tajine with vegetables"},
-            {"day": 3, "breakfast": "Cheese omelette with harissa", "lunch": "Grilled octopus salad", "dinner": "Tunisian grilled chicken"},
-            {"day": 4, "breakfast": "Brik with egg and harissa", "lunch": "Sea bream with lemon", "dinner": "Merguez with mechouia salad"},
-            {"day": 5, "breakfast": "Poached eggs with olive oil", "lunch": "Grilled prawns with garlic", "dinner": "Lamb chops with herbs"},
-            {"day": 6, "breakfast": "Tunisian egg tajine", "lunch": "Grilled tuna steak", "dinner": "Chicken with preserved lemon"},
-            {"day": 7, "breakfast": "Shakshuka with merguez", "lunch": "Mixed seafood grill", "dinner": "Lamb kofta with salad"},
-        ],
-        "balanced": [
-            {"day": 1, "breakfast": "Tunisian breakfast with olive oil and eggs", "lunch": "Couscous with chicken and vegetables", "dinner": "Grilled fish with mechouia salad"},
-            {"day": 2, "breakfast": "Brik with egg and tuna", "lunch": "Lamb tajine with prunes", "dinner": "Tunisian chickpea soup"},
-            {"day": 3, "breakfast": "Msemen with honey and almonds", "lunch": "Grilled sea bass with couscous", "dinner": "Vegetable tajine"},
-            {"day": 4, "breakfast": "Shakshuka with bread", "lunch": "Chicken with preserved lemon", "dinner": "Tunisian salad with tuna"},
-            {"day": 5, "breakfast": "Tunisian pastry with dates", "lunch": "Couscous royal (mixed meats)", "dinner": "Grilled sardines with salad"},
-            {"day": 6, "breakfast": "Olive oil flatbread with harissa", "lunch": "Fish tagine with vegetables", "dinner": "Lentil soup with bread"},
-            {"day": 7, "breakfast": "Fresh figs with yogurt", "lunch": "Lamb couscous", "dinner": "Grilled prawns with salad"},
-        ]
-    }
-    return meal_plans.get(diet, meal_plans["balanced"])
-
-
-def generate_workout_plan(activity_level: str, goal: str):
-    """Generate workout routine based on activity level and goal"""
-    if goal == "lose":
-        return [
-            {"day": 1, "workout": "Cardio - 30 min Running", "duration": 30},
-            {"day": 2, "workout": "Strength Training - Full Body", "duration": 45},
-            {"day": 3, "workout": "Cardio - 30 min Cycling", "duration": 30},
-            {"day": 4, "workout": "Strength Training - Upper Body", "duration": 45},
-            {"day": 5, "workout": "Cardio - 30 min Swimming", "duration": 30},
-            {"day": 6, "workout": "Strength Training - Lower Body", "duration": 45},
-            {"day": 7, "workout": "Active Rest - Yoga or Walking", "duration": 20},
-        ]
-    elif goal == "gain":
-        return [
-            {"day": 1, "workout": "Strength Training - Chest & Triceps", "duration": 60},
-            {"day": 2, "workout": "Strength Training - Back & Biceps", "duration": 60},
-            {"day": 3, "workout": "Light Cardio - 20 min", "duration": 20},
-            {"day": 4, "workout": "Strength Training - Legs", "duration": 60},
-            {"day": 5, "workout": "Strength Training - Shoulders", "duration": 60},
-            {"day": 6, "workout": "Light Cardio - 20 min", "duration": 20},
-            {"day": 7, "workout": "Rest", "duration": 0},
-        ]
-    else:  # maintain
-        return [
-            {"day": 1, "workout": "Full Body Strength Training", "duration": 45},
-            {"day": 2, "workout": "Cardio - 25 min Running", "duration": 25},
-            {"day": 3, "workout": "Full Body Strength Training", "duration": 45},
-            {"day": 4, "workout": "Cardio - 25 min Cycling", "duration": 25},
-            {"day": 5, "workout": "Full Body Strength Training", "duration": 45},
-            {"day": 6, "workout": "Active Rest - Yoga", "duration": 30},
-            {"day": 7, "workout": "Rest", "duration": 0},
-        ]
+logger = logging.getLogger(__name__)
 
 
 @router.post("/generate-plan")
 async def generate_plan(
     current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     # Validate user profile is complete
     if not all([current_user.age, current_user.weight, current_user.height]):
@@ -129,14 +43,17 @@ async def generate_plan(
     tdee = calculate_tdee(bmr, current_user.activity_level or "moderate")
     daily_calories = adjust_calories_for_goal(tdee, current_user.goal or "maintain")
 
+    cache_key = plan_cache_key(current_user)
+    # Plans are plain dicts/tuples (static templates are read-only mappings), so they're
+    # handed to orjson as-is rather than walked by jsonable_encoder
+    cached_plan = await plan_cache.get(cache_key)
+    if cached_plan is not None:
+        return FastJSONResponse(cached_plan)
+
     # Try AI-powered plan generation
     try:
-        if genai:
-            api_key = os.getenv("GEMINI_API_KEY")
-            if api_key:
-                client = genai.Client(api_key=api_key)
-                
-                prompt = f"""Generate a personalized 7-day Mediterranean/Tunisian fitness and nutrition plan for a user with the following profile:
+        if not ai_client.missing_dependencies():
+            prompt = f"""Generate a personalized 7-day Mediterranean/Tunisian fitness and nutrition plan for a user with the following profile:
 - Age: {current_user.age}
 - Weight: {current_user.weight} kg
 - Height: {current_user.height} cm
@@ -166,46 +83,42 @@ Return ONLY a valid JSON object (no markdown, no code blocks) with this exact st
 
 Just provide MEAL NAMES, not recipes or ingredients. Make it Mediterranean/Tunisian focused and healthy."""
 
-                models_to_try = ["gemini-2.0-flash", "gemini-1.5-flash", "gemini-1.5-pro"]
-                
-                for model_name in models_to_try:
-                    try:
-                        response = client.models.generate_content(
-                            model=model_name,
-                            contents=prompt
-                        )
-                        
-                        text = response.text
-                        print(f"AI plan generation successful with {model_name}")
-                        
-                        # Parse JSON response
-                        import json, re
-                        text = re.sub(r'^```json\s*', '', text)
-                        text = re.sub(r'\s*```$', '', text)
-                        match = re.search(r'\{[\s\S]*\}', text)
-                        if match:
-                            ai_plan = json.loads(match.group(0))
-                            
-                            plan = {
-                                "daily_calories": daily_calories,
-                                "bmr": int(bmr),
-                                "tdee": tdee,
-                                "goal": current_user.goal or "maintain",
-                                "diet": current_user.diet or "balanced",
-                                "meal_plan": ai_plan.get("meal_plan", []),
-                                "workout_routine": ai_plan.get("workout_routine", []),
-                                "tips": ai_plan.get("tips", []),
-                                "ai_generated": True
-                            }
-                            return plan
-                    except Exception as e:
-                        print(f"Model {model_name} failed: {str(e)}")
-                        continue
-    except Exception as e:
-        print(f"AI plan generation failed: {str(e)}")
+            response = None
+            try:
+                response, model_name = await ai_client.generate(
+                    prompt,
+                    config=structured_output.json_config(PlanOutput)
+                )
+                logger.info("AI plan generated", extra={"model": model_name})
+            except ai_client.AllModelsFailed as e:
+                logger.warning("All models failed", extra={"error": str(e)})
+
+            # A reply we can't parse falls back to the static plan rather than another model call
+            if response is not None:
+                try:
+                    ai_plan = structured_output.parse_response(response, PlanOutput)
+                except structured_output.StructuredOutputError as e:
+                    logger.warning("AI plan response unusable", extra={"error": str(e)})
+                else:
+                    plan = {
+                        "daily_calories": daily_calories,
+                        "bmr": int(bmr),
+                        "tdee": tdee,
+                        "goal": current_user.goal or "maintain",
+                        "diet": current_user.diet or "balanced",
+                        "meal_plan": [day.model_dump() for day in ai_plan.meal_plan],
+                        "workout_routine": [day.model_dump() for day in ai_plan.workout_routine],
+                        "tips": ai_plan.tips,
+                        "ai_generated": True
+                    }
+                    # Only AI plans are cached; static fallbacks are cheap and should retry AI next time
+                    await plan_cache.set(cache_key, plan)
+                    return FastJSONResponse(plan)
+    except Exception:
+        logger.exception("AI plan generation failed")
 
     # Fallback to static plans if AI fails
-    print("Using fallback static plan generation")
+    logger.info("Using fallback static plan")
     meal_plan = generate_meal_plan_by_diet(
         current_user.diet or "balanced",
         current_user.goal or "maintain"
@@ -227,50 +140,61 @@ Just provide MEAL NAMES, not recipes or ingredients. Make it Mediterranean/Tunis
         "ai_generated": False
     }
 
-    return plan
+    return FastJSONResponse(plan)
 
 
-@router.get("/wellness-score")
-async def get_wellness_score(
-    current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+@router.post("/targets/batch", response_model=schemas.NutritionTargetsBatchResponse)
+async def batch_nutrition_targets(
+    batch: schemas.NutritionTargetsBatch,
+    current_user: models.User = Depends(get_current_user)
 ):
-    """Calculate wellness score based on user's activity and profile completeness"""
-    score = 0
+    """BMR/TDEE/calorie targets and static plan template keys for a cohort of profiles"""
+    columns = bulk_plans(
+        batch.weight, batch.height, batch.age,
+        batch.activity_level or [None] * len(batch.weight),
+        batch.goal or [None] * len(batch.weight),
+        batch.diet or [None] * len(batch.weight),
+        batch.gender,
+    )
+    result = {name: values.tolist() for name, values in columns.items()}
+    result["bmr"] = columns["bmr"].astype(int).tolist()
+    if batch.include_templates:
+        result["meal_plan_templates"] = {key: [dict(day) for day in days] for key, days in MEAL_PLAN_TEMPLATES.items()}
+        result["workout_plan_templates"] = {key: [dict(day) for day in days] for key, days in WORKOUT_PLAN_TEMPLATES.items()}
+    return result
 
-    # Profile completeness (30 points)
-    if current_user.age:
-        score += 5
-    if current_user.weight:
-        score += 5
-    if current_user.height:
-        score += 5
-    if current_user.goal:
-        score += 5
-    if current_user.diet:
-        score += 5
-    if current_user.activity_level:
-        score += 5
 
-    # Activity tracking (40 points) - check recent activities
-    recent_activities = db.query(models.Activity).filter(
-        models.Activity.owner_id == current_user.id
-    ).limit(7).all()
+@router.get("/cache-stats")
+async def get_plan_cache_stats(
+    current_user: models.User = Depends(get_current_user)
+):
+    """Hit/miss counters for the AI plan cache"""
+    return plan_cache.stats()
 
-    score += min(len(recent_activities) * 5, 40)
 
-    # Consistency bonus (30 points)
-    if len(recent_activities) >= 5:
-        score += 30
-    elif len(recent_activities) >= 3:
-        score += 20
-    elif len(recent_activities) >= 1:
-        score += 10
+@router.get("/wellness-score")
+async def get_wellness_score(
+    current_user: models.User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Wellness score based on the user's last 7 days of activity and profile completeness.
+
+    Read from wellness_scores; a missing row, one computed from an older data
+    version (the user wrote since) or before today is recomputed for this user
+    on the spot. The read may go to the replica; the recompute writes, so it
+    runs on the primary.
+    """
+    row = (await db.execute(
+        select(models.WellnessScore).where(wellness.current_score(current_user.id))
+    )).scalar_one_or_none()
+    if row is None or row.computed_at.date() < datetime.utcnow().date():
+        async with AsyncSessionLocal() as primary:
+            row = await wellness.refresh_user(primary, current_user.id)
 
     return {
-        "wellness_score": min(score, 100),
-        "profile_complete": score >= 30,
-        "recent_activities_count": len(recent_activities)
+        "wellness_score": row.score,
+        "profile_complete": row.profile_complete,
+        "recent_activities_count": row.recent_activities_count
     }
 
 
@@ -287,21 +211,17 @@ async def generate_recipe(
         raise HTTPException(status_code=400, detail="Please provide ingredients")
     
     try:
-        if genai:
-            api_key = os.getenv("GEMINI_API_KEY")
-            if api_key:
-                client = genai.Client(api_key=api_key)
-                
-                # Include user preferences if available
-                dietary_info = ""
-                if current_user.diet:
-                    dietary_info = f"\n- Diet preference: {current_user.diet}"
-                if current_user.goal:
-                    dietary_info += f"\n- Health goal: {current_user.goal}"
-                if current_user.health_conditions:
-                    dietary_info += f"\n- Health conditions: {current_user.health_conditions}"
-                
-                prompt = f"""Create a healthy Mediterranean/Tunisian recipe using these available ingredients:
+        if not ai_client.missing_dependencies():
+            # Include user preferences if available
+            dietary_info = ""
+            if current_user.diet:
+                dietary_info = f"\n- Diet preference: {current_user.diet}"
+            if current_user.goal:
+                dietary_info += f"\n- Health goal: {current_user.goal}"
+            if current_user.health_conditions:
+                dietary_info += f"\n- Health conditions: {current_user.health_conditions}"
+            
+            prompt = f"""Create a healthy Mediterranean/Tunisian recipe using these available ingredients:
 {ingredients_list}
 {dietary_info}
 
@@ -335,32 +255,24 @@ Return ONLY a valid JSON object (no markdown, no code blocks) with this structur
   "health_benefits": "Brief description of health benefits"
 }}"""
 
-                models_to_try = ["gemini-2.0-flash", "gemini-1.5-flash", "gemini-1.5-pro"]
-                
-                for model_name in models_to_try:
-                    try:
-                        response = client.models.generate_content(
-                            model=model_name,
-                            contents=prompt
-                        )
-                        
-                        text = response.text
-                        print(f"Recipe generation successful with {model_name}")
-                        
-                        # Parse JSON response
-                        import json, re
-                        text = re.sub(r'^```json\s*', '', text)
-                        text = re.sub(r'\s*```$', '', text)
-                        match = re.search(r'\{[\s\S]*\}', text)
-                        if match:
-                            recipe = json.loads(match.group(0))
-                            return recipe
-                    except Exception as e:
-                        print(f"Model {model_name} failed: {str(e)}")
-                        continue
-        
+            response = None
+            try:
+                response, model_name = await ai_client.generate(
+                    prompt,
+                    config=structured_output.json_config(RecipeOutput)
+                )
+                logger.info("Recipe generated", extra={"model": model_name})
+            except ai_client.AllModelsFailed as e:
+                logger.warning("All models failed", extra={"error": str(e)})
+
+            if response is not None:
+                try:
+                    return structured_output.parse_response(response, RecipeOutput).model_dump()
+                except structured_output.StructuredOutputError as e:
+                    logger.warning("Recipe response unusable", extra={"error": str(e)})
+
         raise HTTPException(status_code=500, detail="Unable to generate recipe. Please try again.")
-                        
-    except Exception as e:
-        print(f"Recipe generation failed: {str(e)}")
+                    
+    except Exception:
+        logger.exception("Recipe generation failed")
         raise HTTPException(status_code=500, detail="Recipe generation failed")
@@ -1,77 +1,101 @@
 # backend/app/routes/upload.py
 from fastapi import APIRouter, File, UploadFile, Depends, HTTPException
-from minio import Minio
-from dotenv import load_dotenv
+from fastapi.concurrency import run_in_threadpool
 import os
-import io
 import base64
+import json
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.auth_utils import get_current_user
-from app.models import User
+from app.database import get_db
+from app.http_cache import bump_data_version
+from app.meal_nutrition import extract_macros
+from app.models import User, Job, MealAnalysis
+from app import ai_client, jobs, metrics, storage, structured_output
+from app.schemas.ai import MealAnalysisOutput
+from app.storage import hash_fileobj, put_bytes, put_stream, UPLOAD_CHUNK_SIZE
+import logging
+import tempfile
 
-try:
-    from google import genai
-except ImportError:
-    genai = None
-
-load_dotenv()
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
-MINIO_ENDPOINT = os.getenv("MINIO_ENDPOINT")
-MINIO_ACCESS_KEY = os.getenv("MINIO_ACCESS_KEY")
-MINIO_SECRET_KEY = os.getenv("MINIO_SECRET_KEY")
-MINIO_BUCKET = os.getenv("MINIO_BUCKET")
-MINIO_PUBLIC_ENDPOINT = os.getenv("MINIO_PUBLIC_ENDPOINT")  # e.g. host.docker.internal:9000
+def content_object_name(digest: str, filename: str | None) -> str:
+    """Content-addressed object name: identical bytes always map to the same key"""
+    extension = os.path.splitext(filename or "")[1].lower() or ".bin"
+    return f"meals/{digest}{extension}"
 
-if not all([MINIO_ENDPOINT, MINIO_ACCESS_KEY, MINIO_SECRET_KEY, MINIO_BUCKET]):
-    raise RuntimeError("MinIO config missing in env")
 
-minio_client = Minio(
-    str(MINIO_ENDPOINT),
-    access_key=MINIO_ACCESS_KEY,
-    secret_key=MINIO_SECRET_KEY,
-    secure=False
-)
+def object_exists(object_name: str) -> bool:
+    try:
+        storage.get_client().stat_object(str(storage.MINIO_BUCKET), object_name)
+        return True
+    except Exception as e:
+        if storage.is_missing_object(e):
+            return False
+        raise
 
-if not minio_client.bucket_exists(MINIO_BUCKET):
-    minio_client.make_bucket(MINIO_BUCKET)
 
-@router.post("/", status_code=201)
-async def upload_image(file: UploadFile = File(...), current_user: User = Depends(get_current_user)):
+def load_stored_analysis(object_name: str) -> dict | None:
+    """Return the .analysis.json stored next to an object, if a usable one exists"""
     try:
-        content = await file.read()
-        buffer = io.BytesIO(content)
-        object_name = file.filename or "upload.bin"
-        minio_client.put_object(
-            str(MINIO_BUCKET),
-            object_name,
-            buffer,
-            length=len(content),
-            content_type=file.content_type or "application/octet-stream"
-        )
+        response = storage.get_client().get_object(str(storage.MINIO_BUCKET), f"{object_name}.analysis.json")
+        try:
+            analysis = json.loads(response.read())
+        finally:
+            response.close()
+            response.release_conn()
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
+        if storage.is_missing_object(e):
+            return None
+        raise
+    # Failed analyses are stored as {"note": ...}; don't replay those
+    if not analysis or "note" in analysis:
+        return None
+    return analysis
 
-    public_endpoint = MINIO_PUBLIC_ENDPOINT or MINIO_ENDPOINT
-    url = f"http://{public_endpoint}/{MINIO_BUCKET}/{object_name}"
 
-    # Gemini AI meal analysis
-    api_key = os.getenv("GEMINI_API_KEY")
+def download_object(object_name: str):
+    """Copy a stored object into a spooled temp file in chunks"""
+    spool = tempfile.SpooledTemporaryFile(max_size=UPLOAD_CHUNK_SIZE)
+    response = storage.get_client().get_object(str(storage.MINIO_BUCKET), object_name)
+    try:
+        for chunk in response.stream(UPLOAD_CHUNK_SIZE):
+            spool.write(chunk)
+    finally:
+        response.close()
+        response.release_conn()
+    spool.seek(0)
+    return spool
+
+
+def store_analysis(object_name: str, analysis: dict):
+    json_bytes = json.dumps(analysis, ensure_ascii=False).encode("utf-8")
+    put_bytes(
+        storage.get_client(),
+        str(storage.MINIO_BUCKET),
+        f"{object_name}.analysis.json",
+        json_bytes,
+        "application/json",
+        "meal_analysis"
+    )
+
+
+async def analyze_image(fileobj, content_type: str) -> dict:
+    """Run Gemini meal analysis; failures come back as {"note": ...}"""
+    missing = ai_client.missing_dependencies()
     analysis = {}
-    print(f"Starting meal analysis with Gemini API...")
+    logger.debug("Starting meal analysis")
     try:
-        if genai and api_key:
-            # Initialize Gemini client
-            client = genai.Client(api_key=api_key)
-            
-            # Save image temporarily for upload
-            import tempfile
-            temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.jpg')
-            temp_file.write(content)
-            temp_file.close()
-            
-            print(f"Uploading image to Gemini...")
-            uploaded_file = client.files.upload(file=temp_file.name)
-            print(f"Image uploaded successfully: {uploaded_file}")
+        if not missing:
+            # Hand Gemini the spooled file directly instead of copying it to another temp file
+            fileobj.seek(0)
+            uploaded_file = await ai_client.upload_file(
+                fileobj,
+                config={"mime_type": content_type}
+            )
+            logger.debug("Image uploaded to Gemini", extra={"gemini_file": getattr(uploaded_file, "name", None)})
             
             prompt = (
                 "Analyze this meal image and return ONLY a valid JSON object (no markdown, no code blocks, no extra text) "
@@ -80,78 +104,171 @@ async def upload_image(file: UploadFile = File(...), current_user: User = Depend
                 "Provide realistic estimates based on the visible food."
             )
             
-            # Try models that support vision
-            models_to_try = ["gemini-2.0-flash", "gemini-1.5-flash", "gemini-1.5-pro"]
+            # Routed to the first healthy vision-capable model
             last_error = None
-            
-            for model_name in models_to_try:
-                try:
-                    print(f"Trying model: {model_name} for image analysis...")
-                    response = client.models.generate_content(
-                        model=model_name,
-                        contents=[prompt, uploaded_file]
-                    )
-                    
-                    text = response.text
-                    print(f"Successfully used model {model_name} for image analysis")
-                    print(f"Response: {text[:200]}...")  # Print first 200 chars
-                    
-                    # Clean up temp file
-                    os.unlink(temp_file.name)
-                    
-                    # Try to extract JSON
-                    import json, re
-                    # Remove markdown code blocks if present
-                    text = re.sub(r'^```json\s*', '', text)
-                    text = re.sub(r'\s*```$', '', text)
-                    match = re.search(r'\{[\s\S]*\}', text)
-                    if match:
-                        try:
-                            analysis = json.loads(match.group(0))
-                            print(f"Successfully parsed JSON analysis")
-                        except Exception as json_error:
-                            print(f"JSON parse error: {str(json_error)}")
-                            analysis = {"text": text}
-                    else:
-                        print(f"No JSON found in response, using raw text")
-                        analysis = {"text": text}
-                    break  # Success, exit loop
-                except Exception as model_error:
-                    last_error = model_error
-                    print(f"Model {model_name} failed for image analysis: {str(model_error)}")
-                    continue
-            
-            # Clean up temp file if still exists
+            response = None
             try:
-                os.unlink(temp_file.name)
-            except:
-                pass
-            
+                response, model_name = await ai_client.generate(
+                    [prompt, uploaded_file],
+                    config=structured_output.json_config(MealAnalysisOutput)
+                )
+                logger.info("Meal analysis generated", extra={"model": model_name})
+            except ai_client.AllModelsFailed as model_error:
+                last_error = model_error.last_error
+
+            # An unparseable reply is kept as raw text instead of paying for another model call
+            if response is not None:
+                try:
+                    analysis = structured_output.parse_response(response, MealAnalysisOutput).model_dump()
+                except structured_output.StructuredOutputError as parse_error:
+                    logger.warning("Meal analysis response unusable", extra={"error": str(parse_error)})
+                    analysis = {"text": response.text}
+
             if not analysis:
-                print(f"All models failed. Last error: {str(last_error)}")
+                logger.warning("Meal analysis failed on every model", extra={"error": str(last_error)})
                 analysis = {"note": f"AI analysis failed: {str(last_error)}"}
         else:
-            missing = []
-            if not genai: missing.append("Gemini SDK")
-            if not api_key: missing.append("GEMINI_API_KEY")
-            print(f"Missing dependencies for image analysis: {', '.join(missing)}")
+            logger.warning("Meal analysis unavailable", extra={"missing": missing})
             analysis = {"note": f"Missing: {', '.join(missing)}"}
     except Exception as e:
-        print(f"Image analysis error: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Meal analysis error")
         analysis = {"note": f"AI analysis failed: {str(e)}"}
+    return analysis
+
+
+async def run_meal_analysis(job: Job, db: AsyncSession) -> dict:
+    """Job handler: analyze a stored meal photo and save it to the owner's insights"""
+    object_name = job.payload["object_name"]
+
+    # Same photo analyzed before (by anyone): skip the model call
+    with metrics.stage("meal_upload", "lookup"):
+        analysis = await run_in_threadpool(load_stored_analysis, object_name)
+    if analysis is None:
+        with metrics.stage("meal_upload", "download"):
+            image = await run_in_threadpool(download_object, object_name)
+        try:
+            with metrics.stage("meal_upload", "analyze"):
+                analysis = await analyze_image(image, job.payload["content_type"])
+        finally:
+            image.close()
+        try:
+            with metrics.stage("meal_upload", "store_analysis"):
+                await run_in_threadpool(store_analysis, object_name, analysis)
+        except Exception as e:
+            # The cached analysis is only an optimization; the job still persists its result
+            logger.warning("Storing meal analysis failed", extra={"object_name": object_name, "error": str(e)})
+        if "note" in analysis:
+            # Let the queue retry with backoff
+            raise RuntimeError(analysis["note"])
+
+    # A job whose lease expired mid-run can be claimed again while the first run
+    # is still going; the unique job_id makes whichever persists second a no-op
+    with metrics.stage("meal_upload", "persist"):
+        meal_id = await db.scalar(
+            pg_insert(MealAnalysis)
+            .values(
+                image_uri=job.payload["url"],
+                analysis_data=analysis,
+                owner_id=job.owner_id,
+                job_id=job.id,
+                **extract_macros(analysis)
+            )
+            .on_conflict_do_nothing(
+                index_elements=[MealAnalysis.job_id],
+                index_where=MealAnalysis.job_id.isnot(None),
+            )
+            .returning(MealAnalysis.id)
+        )
+        if meal_id is None:
+            meal_id = await db.scalar(select(MealAnalysis.id).where(MealAnalysis.job_id == job.id))
+        else:
+            await bump_data_version(db, job.owner_id)
+    return {"analysis": analysis, "meal_analysis_id": meal_id}
+
+
+jobs.register_handler("meal_analysis", run_meal_analysis)
+
+
+def job_status(job: Job) -> dict:
+    result = job.result or {}
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "attempts": job.attempts,
+        "url": job.payload.get("url"),
+        "filename": job.payload.get("object_name"),
+        "analysis": result.get("analysis"),
+        "meal_analysis_id": result.get("meal_analysis_id"),
+        "error": job.error if job.status == "failed" else None,
+    }
+
+
+@router.post("/", status_code=202)
+async def upload_image(
+    file: UploadFile = File(...),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    if not storage.is_configured():
+        raise HTTPException(status_code=500, detail="Storage service not configured")
+
     try:
-        import json
-        json_bytes = json.dumps(analysis, ensure_ascii=False).encode("utf-8")
-        minio_client.put_object(
-            str(MINIO_BUCKET),
-            f"{object_name}.analysis.json",
-            io.BytesIO(json_bytes),
-            length=len(json_bytes),
-            content_type="application/json"
+        # The upload is already spooled by Starlette; hash it in chunks rather than loading it
+        with metrics.stage("meal_upload", "hash"):
+            digest = await run_in_threadpool(hash_fileobj, file.file)
+        object_name = content_object_name(digest, file.filename)
+        url = storage.public_url(object_name)
+
+        with metrics.stage("meal_upload", "store"):
+            if not await run_in_threadpool(object_exists, object_name):
+                await run_in_threadpool(
+                    put_stream,
+                    storage.get_client(),
+                    str(storage.MINIO_BUCKET),
+                    object_name,
+                    file.file,
+                    file.content_type or "application/octet-stream",
+                    "meal_photo"
+                )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
+
+    # Retries of the same photo attach to the job already queued (or finished) for it
+    with metrics.stage("meal_upload", "enqueue"):
+        result = await db.execute(
+            select(Job).where(
+                Job.owner_id == current_user.id,
+                Job.kind == "meal_analysis",
+                Job.status != "failed",
+                Job.payload["object_name"].as_string() == object_name
+            ).order_by(Job.id.desc()).limit(1)
         )
-    except Exception:
-        pass
+        job = result.scalars().first()
+        if job is None:
+            job = await jobs.enqueue(
+                db,
+                "meal_analysis",
+                {
+                    "object_name": object_name,
+                    "url": url,
+                    "content_type": file.content_type or "image/jpeg",
+                },
+                owner_id=current_user.id
+            )
+
+    return job_status(job)
+
 
-    return {"url": url, "filename": object_name, "analysis": analysis}
+@router.get("/jobs/{job_id}")
+async def get_upload_job(
+    job_id: int,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    result = await db.execute(
+        select(Job).where(Job.id == job_id, Job.owner_id == current_user.id)
+    )
+    job = result.scalars().first()
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_status(job)
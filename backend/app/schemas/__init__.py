@@ -1,6 +1,9 @@
 from .user import UserCreate, UserProfileUpdate, UserResponse
 from .token import Token, TokenData
-from .activity import ActivityBase, ActivityCreate, ActivityResponse
+from .activity import ActivityBase, ActivityCreate, ActivityResponse, ActivityBatchItem, ActivityBatchCreate, ActivityBatchResponse
+from .ai import PlanOutput, RecipeOutput, MealAnalysisOutput
+from .plan import NutritionTargetsBatch, NutritionTargetsBatchResponse
+from .dashboard import DashboardStats, DashboardWellness, DashboardResponse
 
 __all__ = [
     "UserCreate",
@@ -11,4 +14,15 @@ __all__ = [
     "ActivityBase",
     "ActivityCreate",
     "ActivityResponse",
+    "ActivityBatchItem",
+    "ActivityBatchCreate",
+    "ActivityBatchResponse",
+    "PlanOutput",
+    "RecipeOutput",
+    "MealAnalysisOutput",
+    "NutritionTargetsBatch",
+    "NutritionTargetsBatchResponse",
+    "DashboardStats",
+    "DashboardWellness",
+    "DashboardResponse",
 ]
@@ -1,6 +1,9 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
 
+# Max activities accepted by one /activity/track-activities/batch call
+ACTIVITY_BATCH_MAX = 200
+
 
 class ActivityBase(BaseModel):
     activity: str
@@ -11,6 +14,15 @@ class ActivityCreate(ActivityBase):
     pass
 
 
+class ActivityBatchItem(ActivityBase):
+    date: datetime | None = None
+    idempotency_key: str = Field(min_length=1, max_length=128)
+
+
+class ActivityBatchCreate(BaseModel):
+    activities: list[ActivityBatchItem] = Field(min_length=1, max_length=ACTIVITY_BATCH_MAX)
+
+
 class ActivityResponse(ActivityBase):
     id: int
     owner_id: int
@@ -19,3 +31,9 @@ class ActivityResponse(ActivityBase):
     model_config = {
         "from_attributes": True
     }
+
+
+class ActivityBatchResponse(BaseModel):
+    created: int
+    duplicates: int
+    activities: list[ActivityResponse]
@@ -0,0 +1,65 @@
+from pydantic import BaseModel, Field, field_validator
+
+# Shapes we ask Gemini to return (sent as response_schema) and validate its replies against.
+# The Gemini API rejects response schemas with non-null defaults, so optional fields
+# default to None in the schema and get their real default once a reply is parsed.
+
+DEFAULT_CUISINE = "Mediterranean/Tunisian"
+
+
+class MealPlanDay(BaseModel):
+    day: int
+    breakfast: str
+    lunch: str
+    dinner: str
+
+
+class WorkoutDay(BaseModel):
+    day: int
+    workout: str
+    duration: int
+
+
+class PlanOutput(BaseModel):
+    meal_plan: list[MealPlanDay]
+    workout_routine: list[WorkoutDay]
+    tips: list[str] | None = Field(None, validate_default=True)
+
+    @field_validator("tips")
+    @classmethod
+    def _default_tips(cls, value):
+        return value or []
+
+
+class RecipeNutrition(BaseModel):
+    calories: float
+    protein_g: float
+    carbs_g: float
+    fat_g: float
+
+
+class RecipeOutput(BaseModel):
+    recipe_name: str
+    cuisine: str | None = Field(None, validate_default=True)
+    prep_time: str | None = None
+    cook_time: str | None = None
+    servings: int | None = None
+    ingredients: list[str]
+    instructions: list[str]
+    nutrition: RecipeNutrition | None = None
+    health_benefits: str | None = None
+
+    @field_validator("cuisine")
+    @classmethod
+    def _default_cuisine(cls, value):
+        return value or DEFAULT_CUISINE
+
+
+class MealAnalysisOutput(BaseModel):
+    description: str
+    calories: float
+    protein_g: float
+    carbs_g: float
+    fat_g: float
+    rating: float
+    suggestion: str
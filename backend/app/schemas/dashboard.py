@@ -0,0 +1,25 @@
+from pydantic import BaseModel, Field
+
+from .activity import ActivityResponse
+from .user import UserResponse
+
+
+class DashboardStats(BaseModel):
+    totalMinutes: int
+    totalActivities: int
+    caloriesBurned: int
+    streak: int
+
+
+class DashboardWellness(BaseModel):
+    wellness_score: int
+    profile_complete: bool
+    recent_activities_count: int
+
+
+class DashboardResponse(BaseModel):
+    """Everything the home screen shows: /auth/me, /activity/stats, /activity/recent and /plan/wellness-score"""
+    user: UserResponse
+    stats: DashboardStats
+    recent: list[ActivityResponse] = Field(default_factory=list)
+    wellness: DashboardWellness
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from datetime import datetime
+from datetime import date, datetime
 from typing import Optional, Any
 
 class MealAnalysisCreate(BaseModel):
@@ -10,8 +10,33 @@ class MealAnalysisResponse(BaseModel):
     id: int
     image_uri: Optional[str]
     analysis_data: dict
+    calories: Optional[float] = None
+    protein_g: Optional[float] = None
+    carbs_g: Optional[float] = None
+    fat_g: Optional[float] = None
     date: datetime
     owner_id: int
 
     class Config:
         from_attributes = True
+
+# Longest window /activity/nutrition-summary will aggregate
+NUTRITION_SUMMARY_MAX_DAYS = 92
+
+class NutritionTotals(BaseModel):
+    meals: int
+    calories: float
+    protein_g: float
+    carbs_g: float
+    fat_g: float
+
+class NutritionDay(NutritionTotals):
+    day: date
+
+class NutritionWeek(NutritionTotals):
+    week_start: date
+
+class NutritionSummaryResponse(BaseModel):
+    days: list[NutritionDay]
+    weeks: list[NutritionWeek]
+    totals: NutritionTotals
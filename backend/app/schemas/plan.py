@@ -0,0 +1,36 @@
+from pydantic import BaseModel, Field, model_validator
+
+# Max profiles accepted by one /plan/targets/batch call
+NUTRITION_BATCH_MAX = 10000
+
+
+class NutritionTargetsBatch(BaseModel):
+    """Profiles as parallel columns; row i of every column is one person"""
+    weight: list[float] = Field(min_length=1, max_length=NUTRITION_BATCH_MAX)
+    height: list[float]
+    age: list[float]
+    activity_level: list[str | None] | None = None
+    goal: list[str | None] | None = None
+    diet: list[str | None] | None = None
+    gender: list[str | None] | None = None
+    include_templates: bool = False
+
+    @model_validator(mode="after")
+    def check_lengths(self):
+        rows = len(self.weight)
+        for name in ("height", "age", "activity_level", "goal", "diet", "gender"):
+            column = getattr(self, name)
+            if column is not None and len(column) != rows:
+                raise ValueError(f"{name} has {len(column)} values, expected {rows}")
+        return self
+
+
+class NutritionTargetsBatchResponse(BaseModel):
+    bmr: list[int]
+    tdee: list[int]
+    daily_calories: list[int]
+    meal_plan: list[str]
+    workout_plan: list[str]
+    # Template key -> 7-day plan, only when include_templates was set
+    meal_plan_templates: dict[str, list[dict]] | None = None
+    workout_plan_templates: dict[str, list[dict]] | None = None
@@ -0,0 +1,150 @@
+# backend/app/storage.py
+# File path: backend/app/storage.py
+import asyncio
+import hashlib
+import io
+import logging
+import os
+import time
+from typing import BinaryIO, Optional
+
+from dotenv import load_dotenv
+from fastapi.concurrency import run_in_threadpool
+
+from app import metrics
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+MINIO_ENDPOINT = os.getenv("MINIO_ENDPOINT")
+MINIO_ACCESS_KEY = os.getenv("MINIO_ACCESS_KEY")
+MINIO_SECRET_KEY = os.getenv("MINIO_SECRET_KEY")
+MINIO_BUCKET = os.getenv("MINIO_BUCKET")
+MINIO_PUBLIC_ENDPOINT = os.getenv("MINIO_PUBLIC_ENDPOINT")  # e.g. host.docker.internal:9000
+
+# Bucket check at startup: attempts and first backoff delay (doubles each retry)
+MINIO_INIT_RETRIES = int(os.getenv("MINIO_INIT_RETRIES", "6"))
+MINIO_INIT_BACKOFF = float(os.getenv("MINIO_INIT_BACKOFF", "0.5"))
+
+# Read size for hashing/streaming the upload spool
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Multipart part size for put_object; MinIO requires >= 5 MiB. The SDK buffers parts
+# in memory (about two at peak), so uploads up to this size are held in full while sent.
+UPLOAD_PART_SIZE = int(os.getenv("UPLOAD_PART_SIZE", str(5 * 1024 * 1024)))
+
+_client = None
+_init_task: Optional[asyncio.Task] = None
+
+
+def is_configured() -> bool:
+    return all([MINIO_ENDPOINT, MINIO_ACCESS_KEY, MINIO_SECRET_KEY, MINIO_BUCKET])
+
+
+def get_client():
+    """The process-wide MinIO client, created on first use.
+
+    Creating it makes no network calls; the bucket is checked separately by
+    the startup task so a MinIO outage can't stop a worker from booting.
+    """
+    global _client
+    if _client is None:
+        if not is_configured():
+            raise RuntimeError("MinIO config missing in env")
+        from minio import Minio
+
+        _client = Minio(
+            str(MINIO_ENDPOINT),
+            access_key=MINIO_ACCESS_KEY,
+            secret_key=MINIO_SECRET_KEY,
+            secure=False
+        )
+    return _client
+
+
+def is_missing_object(error: Exception) -> bool:
+    """True for the S3Error MinIO raises when a key doesn't exist"""
+    return getattr(error, "code", None) in ("NoSuchKey", "NoSuchObject")
+
+
+def public_url(object_name: str) -> str:
+    return f"http://{MINIO_PUBLIC_ENDPOINT or MINIO_ENDPOINT}/{MINIO_BUCKET}/{object_name}"
+
+
+def ensure_bucket():
+    client = get_client()
+    if not client.bucket_exists(MINIO_BUCKET):
+        client.make_bucket(MINIO_BUCKET)
+
+
+async def _init_with_retry(retries: int, backoff: float):
+    for attempt in range(retries):
+        try:
+            await run_in_threadpool(ensure_bucket)
+            logger.info("Storage ready", extra={"bucket": MINIO_BUCKET, "attempt": attempt + 1})
+            return
+        except Exception as e:
+            if attempt == retries - 1:
+                logger.error(
+                    "Storage still unavailable; uploads will fail until MinIO is reachable",
+                    extra={"attempts": retries, "error": str(e)},
+                )
+                return
+            delay = backoff * 2 ** attempt
+            logger.warning("Storage not ready", extra={"attempt": attempt + 1, "retry_in": delay, "error": str(e)})
+            await asyncio.sleep(delay)
+
+
+def start_init(retries: int = MINIO_INIT_RETRIES, backoff: float = MINIO_INIT_BACKOFF):
+    """Check/create the bucket in the background with exponential backoff"""
+    global _init_task
+    if is_configured():
+        _init_task = asyncio.create_task(_init_with_retry(retries, backoff))
+    else:
+        logger.warning("MinIO not configured; upload endpoints are disabled")
+
+
+async def stop_init():
+    if _init_task is not None:
+        _init_task.cancel()
+        await asyncio.gather(_init_task, return_exceptions=True)
+
+
+def hash_fileobj(fileobj: BinaryIO, chunk_size: int = UPLOAD_CHUNK_SIZE) -> str:
+    """SHA-256 of a file object read in fixed-size chunks, rewound afterwards"""
+    digest = hashlib.sha256()
+    fileobj.seek(0)
+    for chunk in iter(lambda: fileobj.read(chunk_size), b""):
+        digest.update(chunk)
+    fileobj.seek(0)
+    return digest.hexdigest()
+
+
+def put_stream(client, bucket: str, object_name: str, fileobj: BinaryIO, content_type: str, kind: str = "upload"):
+    """Stream a file object to MinIO; memory is bounded by UPLOAD_PART_SIZE, not the file size"""
+    size = fileobj.seek(0, os.SEEK_END)
+    fileobj.seek(0)
+    started = time.perf_counter()
+    # Passing the real length lets the SDK read each part at its exact size; with
+    # length=-1 it reads part_size + 1 bytes and then copies the part to drop the extra one.
+    # Parallel part uploads would hold several parts at once.
+    result = client.put_object(
+        bucket,
+        object_name,
+        fileobj,
+        length=size,
+        part_size=UPLOAD_PART_SIZE,
+        content_type=content_type,
+        num_parallel_uploads=1,
+    )
+    metrics.observe_minio_put(kind, time.perf_counter() - started, size)
+    fileobj.seek(0)
+    return result
+
+
+def put_bytes(client, bucket: str, object_name: str, data: bytes, content_type: str, kind: str = "upload"):
+    """Store a small in-memory payload with a known length"""
+    started = time.perf_counter()
+    result = client.put_object(bucket, object_name, io.BytesIO(data), length=len(data), content_type=content_type)
+    metrics.observe_minio_put(kind, time.perf_counter() - started, len(data))
+    return result
@@ -0,0 +1,147 @@
+# backend/app/structured_output.py
+# File path: backend/app/structured_output.py
+"""Schema-constrained JSON from Gemini, validated into Pydantic models.
+
+Routes pass json_config(Model) to ai_client.generate_content so the model is
+asked for JSON matching the schema, then call parse_response(response, Model).
+Replies that are almost valid (code fences, surrounding prose, trailing
+commas, output cut off mid-object) are repaired locally in one linear pass
+rather than by asking another model.
+
+    python -m app.structured_output check   # every response schema converts for the Gemini API
+"""
+import json
+import sys
+from typing import Any, TypeVar
+
+from pydantic import BaseModel, ValidationError
+
+from app.schemas.ai import MealAnalysisOutput, PlanOutput, RecipeOutput
+
+T = TypeVar("T", bound=BaseModel)
+
+# Every model routes send as response_schema
+RESPONSE_SCHEMAS = (PlanOutput, RecipeOutput, MealAnalysisOutput)
+
+_CLOSERS = {"{": "}", "[": "]"}
+
+
+class StructuredOutputError(ValueError):
+    """The model replied, but not with anything that fits the schema"""
+
+
+def json_config(model: type[BaseModel], **config: Any) -> dict:
+    """generate_content config asking for JSON that matches ``model``"""
+    return {"response_mime_type": "application/json", "response_schema": model, **config}
+
+
+def strip_fences(text: str) -> str:
+    text = text.strip()
+    if text.startswith("```"):
+        text = text.split("\n", 1)[1] if "\n" in text else ""
+        if text.rstrip().endswith("```"):
+            text = text.rstrip()[:-3]
+    return text.strip()
+
+
+def repair_json(text: str) -> str:
+    """Best-effort fix-up of a nearly valid JSON object.
+
+    Drops anything before the first '{' and after its matching '}', removes
+    trailing commas, and closes strings/brackets left open by a truncated
+    reply. Single forward scan, no backtracking.
+    """
+    start = text.find("{")
+    if start < 0:
+        raise StructuredOutputError("No JSON object in model output")
+
+    out: list[str] = []
+    stack: list[str] = []
+    in_string = False
+    escaped = False
+    for char in text[start:]:
+        if in_string:
+            out.append(char)
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+            continue
+        if char == '"':
+            in_string = True
+        elif char in _CLOSERS:
+            stack.append(_CLOSERS[char])
+        elif char in "}]":
+            # Trailing comma before a closer
+            while out and out[-1].isspace():
+                out.pop()
+            if out and out[-1] == ",":
+                out.pop()
+            if not stack or stack[-1] != char:
+                break
+            stack.pop()
+            out.append(char)
+            if not stack:
+                break
+            continue
+        out.append(char)
+
+    if in_string:
+        if escaped:
+            out.pop()
+        out.append('"')
+    # Truncated reply: close whatever is still open
+    while stack:
+        while out and (out[-1].isspace() or out[-1] in ",:"):
+            out.pop()
+        out.append(stack.pop())
+    return "".join(out)
+
+
+def parse_text(text: str, model: type[T]) -> T:
+    text = strip_fences(text or "")
+    try:
+        return model.model_validate_json(text)
+    except ValidationError:
+        pass
+    try:
+        return model.model_validate(json.loads(repair_json(text)))
+    except (json.JSONDecodeError, ValidationError) as e:
+        raise StructuredOutputError(f"Model output does not match {model.__name__}: {e}") from e
+
+
+def parse_response(response, model: type[T]) -> T:
+    """Validated ``model`` from a generate_content response, or StructuredOutputError"""
+    parsed = getattr(response, "parsed", None)
+    if isinstance(parsed, model):
+        return parsed
+    return parse_text(response.text, model)
+
+
+def schema_errors(client) -> dict[str, str]:
+    """RESPONSE_SCHEMAS the SDK would refuse to send, with its reason (empty when all convert)"""
+    # The conversion generate_content applies to response_schema; it raises before any request
+    from google.genai import _transformers
+
+    errors = {}
+    for model in RESPONSE_SCHEMAS:
+        try:
+            _transformers.t_schema(client._api_client, model)
+        except Exception as e:
+            errors[model.__name__] = str(e)
+    return errors
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] != ["check"]:
+        sys.exit("usage: python -m app.structured_output check")
+    from google import genai
+
+    failed = schema_errors(genai.Client(api_key="schema-check"))
+    for name, error in failed.items():
+        print(f"{name}: {error}")
+    if failed:
+        sys.exit(1)
+    print(f"{len(RESPONSE_SCHEMAS)} response schemas convert")
@@ -0,0 +1,237 @@
+# backend/app/wellness.py
+# File path: backend/app/wellness.py
+"""Vectorized wellness scoring.
+
+Scores are computed for many users at once from NumPy arrays (profile
+flags and per-day activity counts from activity_daily) and stored in
+wellness_scores, so /plan/wellness-score is a single-row read.
+
+Each stored score carries the users.data_version it was computed from, read
+no later than the data it scores. Readers only accept a score whose version
+still matches (current_score), so a refresh that raced a write can't serve a
+stale score even if it lands after the write's invalidate().
+
+    python -m app.wellness refresh     # recompute every user now
+"""
+import asyncio
+import logging
+import os
+import sys
+from datetime import date, datetime, timedelta
+
+import numpy as np
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import and_, delete, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import ActivityDaily, User, WellnessScore
+
+PROFILE_FIELDS = ("age", "weight", "height", "goal", "diet", "activity_level")
+WINDOW_DAYS = 7
+
+# Full recompute cadence for the in-app scheduler (seconds, 0 disables)
+WELLNESS_REFRESH_SECONDS = int(os.getenv("WELLNESS_REFRESH_SECONDS", "3600"))
+# Users scored per batch during a full refresh
+WELLNESS_CHUNK_SIZE = int(os.getenv("WELLNESS_CHUNK_SIZE", "50000"))
+# Only one worker process runs the scheduled refresh at a time
+REFRESH_LOCK_ID = 0x57454C4C
+
+logger = logging.getLogger(__name__)
+
+_scheduler = None
+
+
+def score_arrays(profile_flags: np.ndarray, day_counts: np.ndarray):
+    """Score users in bulk.
+
+    profile_flags: (n_users, len(PROFILE_FIELDS)) bool, field is filled in
+    day_counts:    (n_users, WINDOW_DAYS) int, activities logged per day
+
+    Returns (scores, profile_complete, recent_counts) arrays of length n_users.
+    """
+    # Profile completeness (30 points)
+    score = profile_flags.sum(axis=1, dtype=np.int32) * 5
+
+    # Activity tracking (40 points) - up to 7 recent activities count
+    recent = np.minimum(day_counts.sum(axis=1, dtype=np.int32), 7)
+    score += np.minimum(recent * 5, 40)
+
+    # Consistency bonus (30 points)
+    score += np.select([recent >= 5, recent >= 3, recent >= 1], [30, 20, 10], 0).astype(np.int32)
+
+    return np.minimum(score, 100), score >= 30, recent
+
+
+def day_matrix(user_ids: np.ndarray, owner_ids: np.ndarray, days_ago: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """Scatter activity_daily rows into a (n_users, WINDOW_DAYS) matrix; user_ids must be sorted"""
+    flat_index = np.searchsorted(user_ids, owner_ids) * WINDOW_DAYS + days_ago
+    totals = np.bincount(flat_index, weights=counts, minlength=len(user_ids) * WINDOW_DAYS)
+    return totals.astype(np.int32).reshape(len(user_ids), WINDOW_DAYS)
+
+
+def _score_rows(user_ids, data_versions, flags, matrix, computed_at: datetime) -> list[dict]:
+    scores, complete, recent = score_arrays(flags, matrix)
+    return [
+        {
+            "owner_id": int(owner_id),
+            "score": int(s),
+            "profile_complete": bool(c),
+            "recent_activities_count": int(r),
+            "data_version": int(version),
+            "computed_at": computed_at,
+        }
+        for owner_id, version, s, c, r in zip(user_ids, data_versions, scores, complete, recent)
+    ]
+
+
+def _upsert_statement():
+    # Executed with a list of rows; SQLAlchemy batches them into multi-row VALUES
+    stmt = pg_insert(WellnessScore)
+    return stmt.on_conflict_do_update(
+        index_elements=[WellnessScore.owner_id],
+        set_={
+            "score": stmt.excluded.score,
+            "profile_complete": stmt.excluded.profile_complete,
+            "recent_activities_count": stmt.excluded.recent_activities_count,
+            "data_version": stmt.excluded.data_version,
+            "computed_at": stmt.excluded.computed_at,
+        },
+        # A full refresh from an older snapshot must not replace a newer per-user score
+        where=WellnessScore.data_version <= stmt.excluded.data_version,
+    )
+
+
+PROFILE_FLAGS_SQL = """
+SELECT id, data_version,
+       COALESCE(age, 0) <> 0, COALESCE(weight, 0) <> 0, COALESCE(height, 0) <> 0,
+       COALESCE(goal, '') <> '', COALESCE(diet, '') <> '', COALESCE(activity_level, '') <> ''
+FROM users
+WHERE id > :after
+ORDER BY id
+LIMIT :limit
+"""
+
+WINDOW_COUNTS_SQL = """
+SELECT owner_id, :today - day, activity_count
+FROM activity_daily
+WHERE owner_id BETWEEN :first AND :last AND day > :today - 7 AND day <= :today
+"""
+
+
+def refresh_all(conn, today: date | None = None, chunk_size: int = WELLNESS_CHUNK_SIZE) -> int:
+    """Recompute every user's score on a sync connection, chunked by user id"""
+    today = today or datetime.utcnow().date()
+    computed_at = datetime.utcnow()
+    after = 0
+    total = 0
+    while True:
+        users = conn.execute(text(PROFILE_FLAGS_SQL), {"after": after, "limit": chunk_size}).fetchall()
+        if not users:
+            break
+        user_array = np.array(users)
+        user_ids = user_array[:, 0].astype(np.int64)
+        data_versions = user_array[:, 1].astype(np.int64)
+        flags = user_array[:, 2:].astype(bool)
+
+        window = conn.execute(
+            text(WINDOW_COUNTS_SQL),
+            {"first": int(user_ids[0]), "last": int(user_ids[-1]), "today": today},
+        ).fetchall()
+        window_array = np.array(window, dtype=np.int64).reshape(-1, 3)
+        matrix = day_matrix(user_ids, window_array[:, 0], window_array[:, 1], window_array[:, 2])
+
+        conn.execute(_upsert_statement(), _score_rows(user_ids, data_versions, flags, matrix, computed_at))
+        conn.commit()
+        total += len(user_ids)
+        after = int(user_ids[-1])
+    return total
+
+
+def current_score(owner_id: int):
+    """Condition for a stored score of this user computed from their current data version"""
+    version = select(User.data_version).where(User.id == owner_id).scalar_subquery()
+    return and_(WellnessScore.owner_id == owner_id, WellnessScore.data_version == version)
+
+
+async def refresh_user(db: AsyncSession, owner_id: int) -> WellnessScore:
+    """Recompute one user's score through the same vectorized path and store it"""
+    today = datetime.utcnow().date()
+    # Version and profile in one read, before the activity it is scored with
+    profile = (await db.execute(
+        select(User.data_version, *(getattr(User, field) for field in PROFILE_FIELDS)).where(User.id == owner_id)
+    )).one()
+    result = await db.execute(
+        select(ActivityDaily.day, ActivityDaily.activity_count).where(
+            ActivityDaily.owner_id == owner_id,
+            ActivityDaily.day > today - timedelta(days=WINDOW_DAYS),
+            ActivityDaily.day <= today,
+        )
+    )
+    window = result.all()
+    user_ids = np.array([owner_id], dtype=np.int64)
+    flags = np.array([[bool(value) for value in profile[1:]]])
+    matrix = day_matrix(
+        user_ids,
+        np.full(len(window), owner_id, dtype=np.int64),
+        np.array([(today - day).days for day, _ in window], dtype=np.int64),
+        np.array([count for _, count in window], dtype=np.int64),
+    )
+    row = _score_rows(user_ids, [profile.data_version], flags, matrix, datetime.utcnow())[0]
+    await db.execute(_upsert_statement(), [row])
+    await db.commit()
+    return WellnessScore(**row)
+
+
+async def invalidate(db: AsyncSession, owner_id: int):
+    """Drop a user's stored score; the next read recomputes it. Runs in the caller's transaction.
+
+    The data_version bump that accompanies every write is what keeps a racing
+    refresh from being served; this just clears the row early.
+    """
+    await db.execute(delete(WellnessScore).where(WellnessScore.owner_id == owner_id))
+
+
+def _refresh_all_locked() -> int | None:
+    from app.database import engine
+
+    with engine.connect() as conn:
+        if not conn.execute(text("SELECT pg_try_advisory_lock(:id)"), {"id": REFRESH_LOCK_ID}).scalar():
+            return None
+        try:
+            return refresh_all(conn)
+        finally:
+            conn.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": REFRESH_LOCK_ID})
+            conn.commit()
+
+
+async def _scheduler_loop():
+    while True:
+        await asyncio.sleep(WELLNESS_REFRESH_SECONDS)
+        try:
+            refreshed = await run_in_threadpool(_refresh_all_locked)
+            if refreshed is not None:
+                logger.info("Refreshed wellness scores", extra={"users": refreshed})
+        except Exception:
+            logger.exception("Wellness refresh failed")
+
+
+def start_scheduler():
+    global _scheduler
+    if WELLNESS_REFRESH_SECONDS > 0:
+        _scheduler = asyncio.create_task(_scheduler_loop())
+
+
+async def stop_scheduler():
+    if _scheduler is not None:
+        _scheduler.cancel()
+        await asyncio.gather(_scheduler, return_exceptions=True)
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] != ["refresh"]:
+        sys.exit("usage: python -m app.wellness refresh")
+    from app.database import engine
+
+    with engine.connect() as conn:
+        print(f"Refreshed wellness scores for {refresh_all(conn)} users")
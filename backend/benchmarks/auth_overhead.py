@@ -0,0 +1,75 @@
+# backend/benchmarks/auth_overhead.py
+"""Per-request cost of authenticating a bearer token, with and without the user cache.
+
+Runs offline: the session is replaced by one that answers the users lookup
+after a simulated Postgres round-trip (``--db-latency-ms``), so the numbers
+isolate JWT decode + lookup overhead.
+
+    JWT_SECRET=bench python -m benchmarks.auth_overhead --requests 5000 --db-latency-ms 0.5
+"""
+import argparse
+import asyncio
+import os
+import time
+
+os.environ.setdefault("JWT_SECRET", "benchmark-secret")
+
+from app import auth_utils  # noqa: E402
+from app.cache import InMemoryCache  # noqa: E402
+from app.models import User  # noqa: E402
+
+
+class _Result:
+    def __init__(self, user):
+        self._user = user
+
+    def scalars(self):
+        return self
+
+    def first(self):
+        return self._user
+
+
+class LatencySession:
+    """Answers every query with the same user after a fixed delay"""
+
+    def __init__(self, user: User, latency: float):
+        self.user = user
+        self.latency = latency
+        self.queries = 0
+
+    async def execute(self, statement):
+        self.queries += 1
+        await asyncio.sleep(self.latency)
+        return _Result(self.user)
+
+
+async def measure(label: str, dependency, token: str, session: LatencySession, requests: int):
+    session.queries = 0
+    started = time.perf_counter()
+    for _ in range(requests):
+        await dependency(token, session)
+    elapsed = time.perf_counter() - started
+    print(f"{label:>14}: {elapsed / requests * 1e6:8.1f} us/request, {session.queries} DB queries")
+
+
+async def main(args):
+    user = User(
+        id=1, email="bench@example.com", username="bench", hashed_password="x",
+        age=30, weight=70, height=175, goal="maintain", diet="balanced", activity_level="moderate",
+    )
+    token = auth_utils.create_access_token({"sub": user.email})
+    session = LatencySession(user, args.db_latency_ms / 1000)
+    auth_utils.user_cache = InMemoryCache(maxsize=10000, ttl=60)
+
+    print(f"{args.requests} authenticated requests, simulated DB latency {args.db_latency_ms} ms")
+    await measure("uncached", auth_utils.get_current_user_orm, token, session, args.requests)
+    await measure("cached", auth_utils.get_current_user, token, session, args.requests)
+    print(f"cache stats: {auth_utils.user_cache.stats()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--db-latency-ms", type=float, default=0.5)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,96 @@
+# backend/benchmarks/db_load.py
+"""Concurrency load benchmark for the DB-backed endpoints.
+
+Run it against a live API (e.g. ``docker-compose up``) once on the old
+sync-session build and once on the async build, and compare the highest
+concurrency level each worker sustains before p99 latency blows up:
+
+    python -m benchmarks.db_load --base-url http://localhost:8000 \\
+        --email bench@example.com --password secret --levels 1,8,32,128
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+DEFAULT_PATHS = ["/auth/me", "/activity/recent", "/activity/stats", "/plan/wellness-score"]
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def login(client: httpx.AsyncClient, email: str, password: str) -> str:
+    response = await client.post("/auth/login", json={"username": email, "password": password})
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+async def run_level(client: httpx.AsyncClient, headers: dict, paths: list[str], concurrency: int, requests: int):
+    latencies: list[float] = []
+    errors = 0
+    queue: asyncio.Queue = asyncio.Queue()
+    for i in range(requests):
+        queue.put_nowait(paths[i % len(paths)])
+
+    async def worker():
+        nonlocal errors
+        while True:
+            try:
+                path = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            start = time.perf_counter()
+            try:
+                response = await client.get(path, headers=headers)
+                if response.status_code >= 400:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "concurrency": concurrency,
+        "requests": requests,
+        "errors": errors,
+        "rps": requests / elapsed if elapsed else 0.0,
+        "p50_ms": statistics.median(latencies) if latencies else 0.0,
+        "p99_ms": percentile(latencies, 99),
+    }
+
+
+async def main(args):
+    levels = [int(level) for level in args.levels.split(",")]
+    limits = httpx.Limits(max_connections=max(levels), max_keepalive_connections=max(levels))
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=args.timeout) as client:
+        token = await login(client, args.email, args.password)
+        headers = {"Authorization": f"Bearer {token}"}
+        print(f"{'conc':>6} {'reqs':>6} {'errors':>6} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9}")
+        for level in levels:
+            result = await run_level(client, headers, args.paths, level, max(args.requests, level))
+            print(
+                f"{result['concurrency']:>6} {result['requests']:>6} {result['errors']:>6} "
+                f"{result['rps']:>9.1f} {result['p50_ms']:>9.1f} {result['p99_ms']:>9.1f}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--levels", default="1,8,32,128")
+    parser.add_argument("--requests", type=int, default=500, help="requests per concurrency level")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--paths", nargs="+", default=DEFAULT_PATHS)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,77 @@
+# backend/benchmarks/fake_gemini.py
+"""Local stand-in for the Gemini API with per-model latency and failure injection.
+
+Point the API at it with GEMINI_BASE_URL to exercise model routing without
+network access or quota:
+
+    python -m benchmarks.fake_gemini --port 8090 --fail gemini-2.0-flash=1.0 --latency gemini-1.5-flash=0.3
+    GEMINI_BASE_URL=http://localhost:8090 GEMINI_API_KEY=fake uvicorn app.main:app
+
+Supports generateContent and streamGenerateContent (alt=sse). Requests asking
+for JSON get --json-reply (default "{}"); file uploads are not emulated.
+"""
+import argparse
+import asyncio
+import json
+import random
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+DEFAULT_REPLY = (
+    "Stay hydrated, aim for 30 minutes of movement today, "
+    "and build your plate around vegetables and lean protein."
+)
+
+
+def parse_model_values(pairs: list[str]) -> dict[str, float]:
+    values = {}
+    for pair in pairs:
+        model, _, value = pair.partition("=")
+        values[model] = float(value)
+    return values
+
+
+def candidate(text: str) -> dict:
+    return {"candidates": [{"content": {"role": "model", "parts": [{"text": text}]}, "finishReason": "STOP", "index": 0}]}
+
+
+def create_app(latency: dict[str, float], failure_rate: dict[str, float], reply: str, json_reply: str) -> Starlette:
+    async def generate(request: Request):
+        model, _, method = request.path_params["target"].partition(":")
+        body = await request.json()
+        await asyncio.sleep(latency.get(model, 0.0))
+        if random.random() < failure_rate.get(model, 0.0):
+            return JSONResponse(
+                {"error": {"code": 503, "message": f"{model} is unavailable", "status": "UNAVAILABLE"}},
+                status_code=503,
+            )
+        wants_json = body.get("generationConfig", {}).get("responseMimeType") == "application/json"
+        text = json_reply if wants_json else reply
+        if method != "streamGenerateContent":
+            return JSONResponse(candidate(text))
+
+        async def events():
+            for word in text.split(" "):
+                yield f"data: {json.dumps(candidate(word + ' '))}\r\n\r\n"
+                await asyncio.sleep(0.01)
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return Starlette(routes=[Route("/{version}/models/{target}", generate, methods=["POST"])])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency", nargs="*", default=[], metavar="MODEL=SECONDS")
+    parser.add_argument("--fail", nargs="*", default=[], metavar="MODEL=RATE")
+    parser.add_argument("--reply", default=DEFAULT_REPLY)
+    parser.add_argument("--json-reply", default="{}")
+    args = parser.parse_args()
+    app = create_app(parse_model_values(args.latency), parse_model_values(args.fail), args.reply, args.json_reply)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
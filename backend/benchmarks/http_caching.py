@@ -0,0 +1,148 @@
+# backend/benchmarks/http_caching.py
+"""Bytes on the wire and latency with compression and version-ETag conditional GETs.
+
+Runs offline against an in-process app carrying the real CompressionMiddleware
+and ConditionalGetMiddleware. Handlers return realistic bodies (a page of
+meal insights with full analysis_data, a 7-day generated plan) after a
+simulated Postgres round-trip per query (``--db-latency-ms``); the version
+lookup costs one such round-trip.
+
+    python -m benchmarks.http_caching --requests 500 --db-latency-ms 0.5
+"""
+import argparse
+import asyncio
+import gzip
+import json
+import os
+import statistics
+import time
+
+os.environ.setdefault("JWT_SECRET", "benchmark-secret")
+
+import httpx  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+
+from app import compression  # noqa: E402
+from app.auth_utils import create_access_token  # noqa: E402
+from app.compression import CompressionMiddleware  # noqa: E402
+from app.http_cache import ConditionalGetMiddleware  # noqa: E402
+
+DISHES = ["couscous with lamb", "tajine with olives", "brik with egg", "grilled sea bream", "mechouia salad",
+          "lablabi", "chakchouka", "ojja with merguez", "fish kammounia", "tuna salad with harissa"]
+
+
+def meal_insights_page(size: int = 20) -> list[dict]:
+    return [
+        {
+            "id": 1000 - i,
+            "owner_id": 1,
+            "image_uri": f"https://minio.example.com/keepitfit/meal_1_{'%032x' % (i * 7919)}.jpg",
+            "date": f"2026-10-{17 - i % 15:02d}T12:{i % 60:02d}:00",
+            "analysis_data": {
+                "description": f"A plate of {DISHES[i % len(DISHES)]} with a side of bread and olive oil.",
+                "calories": 520.0 + i * 13,
+                "protein_g": 31.5,
+                "carbs_g": 48.0 + i,
+                "fat_g": 21.0,
+                "rating": 7.5,
+                "suggestion": "Swap the white bread for whole grain and add a side of raw vegetables "
+                              "to bring the fibre up; keep the olive oil to a tablespoon.",
+            },
+        }
+        for i in range(size)
+    ]
+
+
+def generated_plan() -> dict:
+    return {
+        "meal_plan": [
+            {"day": d, "breakfast": f"{DISHES[d % 10]} and mint tea", "lunch": DISHES[(d + 3) % 10],
+             "dinner": f"{DISHES[(d + 6) % 10]} with steamed vegetables"}
+            for d in range(1, 8)
+        ],
+        "workout_routine": [
+            {"day": d, "workout": "30 min brisk walk, 3x12 squats, 3x10 push-ups, 3x30s plank", "duration": 45}
+            for d in range(1, 8)
+        ],
+        "tips": ["Drink water before each meal", "Favour olive oil over butter", "Sleep 7-8 hours"],
+        "daily_calories": 2150,
+        "bmr": 1690,
+        "tdee": 2620,
+    }
+
+
+def create_app(db_latency: float) -> FastAPI:
+    async def lookup(email):
+        await asyncio.sleep(db_latency)
+        return 1, 42
+
+    app = FastAPI()
+
+    @app.get("/activity/meal-insights")
+    async def meal_insights():
+        await asyncio.sleep(db_latency * 2)  # auth lookup + page query
+        return meal_insights_page()
+
+    @app.get("/plan/generated")
+    async def plan():
+        await asyncio.sleep(db_latency * 2)  # auth lookup + cache check
+        return generated_plan()
+
+    app.add_middleware(ConditionalGetMiddleware, lookup=lookup)
+    app.add_middleware(CompressionMiddleware)
+    return app
+
+
+def report_sizes():
+    print("response size (bytes)      identity      gzip   brotli")
+    for label, payload in (("meal-insights page", meal_insights_page()), ("generated plan", generated_plan())):
+        body = json.dumps(payload).encode("utf-8")
+        gz = len(gzip.compress(body, compresslevel=compression.GZIP_LEVEL))
+        br = len(compression.compress(body, "br")) if compression.brotli is not None else None
+        print(f"  {label:<22} {len(body):10d} {gz:9d} {br if br is not None else 'n/a':>8}   "
+              f"gzip saves {100 * (1 - gz / len(body)):.0f}%")
+
+
+async def measure(client: httpx.AsyncClient, label: str, path: str, headers: dict, requests: int):
+    latencies, sent = [], 0
+    for _ in range(requests):
+        started = time.perf_counter()
+        response = await client.get(path, headers=headers)
+        latencies.append(time.perf_counter() - started)
+        sent += int(response.headers.get("content-length", len(response.content)))
+    print(f"  {label:<30} status {response.status_code}   p50 {statistics.median(latencies) * 1000:6.2f} ms   "
+          f"{sent / requests:8.0f} bytes/response")
+
+
+async def main(args):
+    report_sizes()
+    if compression.brotli is None:
+        print("  (brotli column needs `pip install brotli`; the middleware falls back to gzip without it)")
+
+    app = create_app(args.db_latency_ms / 1000)
+    token = create_access_token({"sub": "bench@example.com"})
+    auth = {"Authorization": f"Bearer {token}"}
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        first = await client.get("/activity/meal-insights", headers={**auth, "Accept-Encoding": "identity"})
+        etag = first.headers["etag"]
+
+        print(f"\n{args.requests} requests each, simulated DB latency {args.db_latency_ms} ms")
+        print("GET /activity/meal-insights")
+        await measure(client, "full body, uncompressed", "/activity/meal-insights",
+                      {**auth, "Accept-Encoding": "identity"}, args.requests)
+        await measure(client, "full body, gzip", "/activity/meal-insights",
+                      {**auth, "Accept-Encoding": "gzip"}, args.requests)
+        await measure(client, "full body, br/gzip", "/activity/meal-insights",
+                      {**auth, "Accept-Encoding": "br, gzip"}, args.requests)
+        await measure(client, "If-None-Match -> 304", "/activity/meal-insights",
+                      {**auth, "If-None-Match": etag}, args.requests)
+        print("GET generated plan (compression only; plans are POST /plan/generate-plan)")
+        await measure(client, "uncompressed", "/plan/generated", {"Accept-Encoding": "identity"}, args.requests)
+        await measure(client, "br/gzip", "/plan/generated", {"Accept-Encoding": "br, gzip"}, args.requests)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--db-latency-ms", type=float, default=0.5)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,110 @@
+# backend/benchmarks/model_routing.py
+"""Request latency through the Gemini fallback chain while the primary model is failing.
+
+Starts benchmarks.fake_gemini in-process with the first model failing or
+hanging, then sends the same load through the old sequential fallback loop
+and through ModelRouter (circuit breakers, optionally hedging).
+
+    python -m benchmarks.model_routing --requests 200 --primary-mode hang --timeout 2
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+import uvicorn
+
+from app.model_router import ModelRouter
+from benchmarks.fake_gemini import create_app
+
+MODELS = ["gemini-2.0-flash", "gemini-1.5-flash", "gemini-1.5-pro"]
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+async def run_load(label: str, call_once, requests: int, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+    errors = 0
+
+    async def one():
+        nonlocal errors
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                await call_once()
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    elapsed = time.perf_counter() - started
+    print(f"{label:<22} p50 {statistics.median(latencies) * 1000:8.1f} ms   "
+          f"p99 {percentile(latencies, 0.99) * 1000:8.1f} ms   "
+          f"errors {errors:4d}   {requests / elapsed:7.1f} req/s")
+
+
+async def main(args):
+    latency = {model: args.model_latency for model in MODELS}
+    failure_rate = {}
+    if args.primary_mode == "hang":
+        latency[MODELS[0]] = 3600
+    else:
+        failure_rate[MODELS[0]] = 1.0
+
+    server = uvicorn.Server(uvicorn.Config(
+        create_app(latency, failure_rate, "ok", "{}"), host="127.0.0.1", port=args.port, log_level="error",
+        timeout_graceful_shutdown=1,
+    ))
+    serve = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    from google import genai
+
+    client = genai.Client(api_key="fake", http_options={
+        "base_url": f"http://127.0.0.1:{args.port}",
+        "timeout": int(args.timeout * 1000),
+    })
+
+    def request(model):
+        return client.aio.models.generate_content(model=model, contents="ping")
+
+    async def sequential():
+        # The loop every route used to run: each request pays for the dead model first
+        last_error = None
+        for model in MODELS:
+            try:
+                return await asyncio.wait_for(request(model), args.timeout)
+            except Exception as e:
+                last_error = e
+        raise last_error
+
+    router = ModelRouter(MODELS, timeout=args.timeout, cooldown=60)
+    hedged = ModelRouter(MODELS, timeout=args.timeout, cooldown=60, hedge_after=args.hedge_after)
+
+    print(f"{args.requests} requests, concurrency {args.concurrency}, primary model {args.primary_mode}s")
+    await run_load("sequential fallback", sequential, args.requests, args.concurrency)
+    await run_load("router", lambda: router.call(request), args.requests, args.concurrency)
+    await run_load(f"router + hedge@{args.hedge_after}s", lambda: hedged.call(request), args.requests, args.concurrency)
+    print(f"router stats: {router.stats()}")
+
+    server.should_exit = True
+    await serve
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--primary-mode", choices=["fail", "hang"], default="hang")
+    parser.add_argument("--timeout", type=float, default=2.0)
+    parser.add_argument("--hedge-after", type=float, default=0.5)
+    parser.add_argument("--model-latency", type=float, default=0.05)
+    parser.add_argument("--port", type=int, default=int(os.getenv("FAKE_GEMINI_PORT", "8091")))
+    asyncio.run(main(parser.parse_args()))
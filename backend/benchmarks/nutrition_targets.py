@@ -0,0 +1,90 @@
+# backend/benchmarks/nutrition_targets.py
+"""Throughput of the bulk calorie-target path against the per-user helpers.
+
+Runs offline on a synthetic cohort; the per-user loop is timed on a sample
+and extrapolated.
+
+    python -m benchmarks.nutrition_targets --users 1000000
+"""
+import argparse
+import time
+
+import numpy as np
+
+from app.nutrition import (
+    ACTIVITY_MULTIPLIERS,
+    MEAL_PLAN_TEMPLATES,
+    adjust_calories_for_goal,
+    bulk_plans,
+    calculate_bmr,
+    calculate_tdee,
+    generate_meal_plan_by_diet,
+    generate_workout_plan,
+    meal_plan_key,
+    workout_plan_key,
+)
+
+GOALS = ("lose", "gain", "maintain", None)
+DIETS = (*MEAL_PLAN_TEMPLATES, None)
+
+
+def synthetic_cohort(users: int, rng):
+    """Columnar profiles as a cohort job would load them: numeric and object arrays"""
+    levels = np.array([*ACTIVITY_MULTIPLIERS, None], dtype=object)
+    return {
+        "weight": rng.integers(45, 140, size=users),
+        "height": rng.integers(150, 205, size=users),
+        "age": rng.integers(16, 85, size=users),
+        "activity_level": levels[rng.integers(0, len(levels), size=users)],
+        "goal": np.array(GOALS, dtype=object)[rng.integers(0, len(GOALS), size=users)],
+        "diet": np.array(DIETS, dtype=object)[rng.integers(0, len(DIETS), size=users)],
+    }
+
+
+def per_user(profiles, count: int):
+    """Targets and fallback plans the way /plan/generate-plan computes them, one user at a time"""
+    rows = []
+    for i in range(count):
+        goal = profiles["goal"][i] or "maintain"
+        bmr = calculate_bmr(profiles["weight"][i], profiles["height"][i], profiles["age"][i])
+        tdee = calculate_tdee(bmr, profiles["activity_level"][i] or "moderate")
+        generate_meal_plan_by_diet(profiles["diet"][i] or "balanced", goal)
+        generate_workout_plan(profiles["activity_level"][i] or "moderate", goal)
+        rows.append((int(bmr), tdee, adjust_calories_for_goal(tdee, goal),
+                     meal_plan_key(profiles["diet"][i] or "balanced"), workout_plan_key(goal)))
+    return rows
+
+
+def main(args):
+    rng = np.random.default_rng(42)
+    cohort = synthetic_cohort(args.users, rng)
+    print(f"{args.users} synthetic profiles")
+
+    started = time.perf_counter()
+    columns = bulk_plans(**cohort)
+    bulk = time.perf_counter() - started
+    print(f"bulk: {bulk * 1000:.1f} ms ({args.users / bulk / 1e6:.2f}M users/s)")
+
+    sample = min(args.sample, args.users)
+    profiles = {name: column[:sample].tolist() for name, column in cohort.items()}
+    started = time.perf_counter()
+    loop_rows = per_user(profiles, sample)
+    loop = (time.perf_counter() - started) * args.users / sample
+    print(f"per-user loop: {loop * 1000:.1f} ms extrapolated from {sample} users "
+          f"({args.users / loop / 1e6:.2f}M users/s)")
+
+    bulk_rows = list(zip(
+        columns["bmr"][:sample].astype(int).tolist(),
+        columns["tdee"][:sample].tolist(),
+        columns["daily_calories"][:sample].tolist(),
+        columns["meal_plan"][:sample].tolist(),
+        columns["workout_plan"][:sample].tolist(),
+    ))
+    assert bulk_rows == loop_rows, "bulk targets diverge from the per-user helpers"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--sample", type=int, default=100_000)
+    main(parser.parse_args())
@@ -0,0 +1,120 @@
+# backend/benchmarks/query_plans.py
+"""Seed a local Postgres with millions of rows and report plans/timings for the hot queries.
+
+Point DATABASE_URL at a throwaway database that has been migrated
+(``alembic upgrade head``), then:
+
+    python -m benchmarks.query_plans --users 10000 --activities 3000000 --meals 1000000
+
+Run once with ``--without-indexes`` to drop the composite indexes and see
+the before picture; run again without it to rebuild them and compare.
+"""
+import argparse
+import statistics
+import time
+
+from sqlalchemy import create_engine, text
+
+from app.database import DATABASE_URL
+
+HOT_QUERIES = {
+    "recent_activities": (
+        "SELECT * FROM activities WHERE owner_id = :owner_id ORDER BY date DESC LIMIT 10"
+    ),
+    "meal_insights": (
+        "SELECT * FROM meal_analyses WHERE owner_id = :owner_id ORDER BY date DESC LIMIT 20"
+    ),
+    "activity_stats_week": (
+        "SELECT * FROM activities WHERE owner_id = :owner_id "
+        "AND date >= now() - interval '7 days'"
+    ),
+    "wellness_recent": (
+        "SELECT * FROM activities WHERE owner_id = :owner_id ORDER BY date DESC LIMIT 7"
+    ),
+    # Keyset page deep into a long history; should cost the same as page 1
+    "recent_activities_deep_page": (
+        "SELECT * FROM activities WHERE owner_id = :owner_id "
+        "AND (date, id) < (now() - interval '600 days', 0) "
+        "ORDER BY date DESC, id DESC LIMIT 10"
+    ),
+}
+
+INDEXES = {
+    "ix_activities_owner_id_date_id": (
+        "CREATE INDEX IF NOT EXISTS ix_activities_owner_id_date_id ON activities (owner_id, date DESC, id DESC)"
+    ),
+    "ix_meal_analyses_owner_id_date_id": (
+        "CREATE INDEX IF NOT EXISTS ix_meal_analyses_owner_id_date_id ON meal_analyses (owner_id, date DESC, id DESC)"
+    ),
+}
+
+
+def seed(conn, users: int, activities: int, meals: int):
+    existing = conn.execute(text("SELECT count(*) FROM users WHERE email LIKE 'bench-%'")).scalar_one()
+    if existing >= users:
+        print(f"Reusing {existing} seeded users")
+        return
+    print(f"Seeding {users} users, {activities} activities, {meals} meal analyses...")
+    started = time.perf_counter()
+    conn.execute(text(
+        "INSERT INTO users (email, username, hashed_password, age, weight, height) "
+        "SELECT 'bench-' || g || '@example.com', 'bench-' || g, 'x', 30, 70, 175 "
+        "FROM generate_series(1, :users) g"
+    ), {"users": users})
+    ids = "(SELECT id FROM users WHERE email LIKE 'bench-%' ORDER BY id)"
+    conn.execute(text(
+        f"INSERT INTO activities (activity, duration, date, owner_id) "
+        f"SELECT 'run', 10 + (random() * 50)::int, now() - random() * interval '730 days', "
+        f"(array(SELECT id FROM {ids} AS u))[1 + (g % :users)] "
+        f"FROM generate_series(1, :rows) g"
+    ), {"users": users, "rows": activities})
+    conn.execute(text(
+        f"INSERT INTO meal_analyses (image_uri, analysis_data, date, owner_id) "
+        f"SELECT NULL, json_build_object('calories', (random() * 900)::int), "
+        f"now() - random() * interval '730 days', "
+        f"(array(SELECT id FROM {ids} AS u))[1 + (g % :users)] "
+        f"FROM generate_series(1, :rows) g"
+    ), {"users": users, "rows": meals})
+    conn.execute(text("ANALYZE users; ANALYZE activities; ANALYZE meal_analyses"))
+    print(f"Seeded in {time.perf_counter() - started:.1f}s")
+
+
+def sample_owner(conn) -> int:
+    return conn.execute(text(
+        "SELECT owner_id FROM activities GROUP BY owner_id ORDER BY count(*) DESC LIMIT 1"
+    )).scalar_one()
+
+
+def report(conn, owner_id: int, repeats: int):
+    for name, sql in HOT_QUERIES.items():
+        params = {"owner_id": owner_id}
+        plan = conn.execute(text(f"EXPLAIN (ANALYZE, BUFFERS) {sql}"), params).scalars().all()
+        timings = []
+        for _ in range(repeats):
+            started = time.perf_counter()
+            conn.execute(text(sql), params).fetchall()
+            timings.append((time.perf_counter() - started) * 1000)
+        print(f"\n== {name}: median {statistics.median(timings):.2f} ms, max {max(timings):.2f} ms over {repeats} runs")
+        for line in plan:
+            print(f"   {line}")
+
+
+def main(args):
+    engine = create_engine(DATABASE_URL)
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        seed(conn, args.users, args.activities, args.meals)
+        for name, ddl in INDEXES.items():
+            conn.execute(text(f"DROP INDEX IF EXISTS {name}" if args.without_indexes else ddl))
+        conn.execute(text("ANALYZE activities; ANALYZE meal_analyses"))
+        print(f"Composite indexes: {'dropped' if args.without_indexes else 'present'}")
+        report(conn, sample_owner(conn), args.repeats)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--activities", type=int, default=3000000)
+    parser.add_argument("--meals", type=int, default=1000000)
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--without-indexes", action="store_true")
+    main(parser.parse_args())
@@ -0,0 +1,151 @@
+# backend/benchmarks/serialization.py
+"""Response serialization cost for /activity/recent, /activity/meal-insights and /plan/generate-plan.
+
+Compares, per response body:
+  default   FastAPI's path before this change: response_model validation of
+            ORM objects, then stdlib json (starlette JSONResponse)
+  orjson    the same validation, rendered by FastJSONResponse
+  fast      SQL rows / plain dicts rendered directly by FastJSONResponse
+
+Rows come from an in-memory SQLite copy of the tables so the ORM objects and
+result tuples are the real thing; query time is not included.
+
+    python -m benchmarks.serialization --page 20 --iterations 2000
+"""
+import argparse
+import json
+import os
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault("JWT_SECRET", "benchmark-secret")
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.utils import create_response_field  # noqa: E402
+from sqlalchemy import create_engine, select  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+from starlette.responses import JSONResponse  # noqa: E402
+
+from app.meal_nutrition import extract_macros  # noqa: E402
+from app.models import Activity, MealAnalysis, User  # noqa: E402
+from app.nutrition import generate_meal_plan_by_diet, generate_workout_plan  # noqa: E402
+from app.responses import FastJSONResponse, dumps, rows_response  # noqa: E402
+from app.routes.activity import ACTIVITY_COLUMNS, MEAL_ANALYSIS_COLUMNS  # noqa: E402
+from app.schemas.activity import ActivityResponse  # noqa: E402
+from app.schemas.meal_analysis import MealAnalysisResponse  # noqa: E402
+from benchmarks.http_caching import generated_plan  # noqa: E402
+
+
+def seed(page: int):
+    engine = create_engine("sqlite://")
+    for table in (User.__table__, Activity.__table__, MealAnalysis.__table__):
+        table.create(engine)
+    now = datetime(2026, 10, 17, 12, 0)
+    with Session(engine) as db:
+        db.add(User(id=1, email="bench@example.com", username="bench", hashed_password="x"))
+        for i in range(page):
+            db.add(Activity(activity="running", duration=30 + i, date=now - timedelta(hours=i), owner_id=1))
+            analysis = {
+                "description": "Couscous with lamb, chickpeas and vegetables, served with bread.",
+                "calories": 640.0 + i, "protein_g": 34.0, "carbs_g": 72.5, "fat_g": 21.0, "rating": 7.0,
+                "suggestion": "Halve the bread and add a green salad to keep the meal under 600 kcal.",
+            }
+            db.add(MealAnalysis(
+                image_uri=f"https://minio.example.com/keepitfit/meals/{i:064x}.jpg",
+                analysis_data=analysis,
+                date=now - timedelta(hours=i),
+                owner_id=1,
+                **extract_macros(analysis),
+            ))
+        db.commit()
+    return engine
+
+
+def fetch(engine, model, columns):
+    with Session(engine, expire_on_commit=False) as db:
+        entities = db.scalars(select(model).order_by(model.date.desc())).all()
+        rows = db.execute(select(*columns).order_by(model.date.desc())).all()
+    return entities, rows
+
+
+def timed(fn, iterations: int) -> float:
+    fn()
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+def validated(field, content):
+    # What fastapi.routing.serialize_response does with a response_model under pydantic v2
+    value, errors = field.validate(content, {}, loc=("response",))
+    assert not errors, errors
+    return field.serialize(value)
+
+
+def compare(label: str, field, entities, rows, iterations: int):
+    def default():
+        return JSONResponse(validated(field, entities)).body
+
+    def orjson_path():
+        return FastJSONResponse(validated(field, entities)).body
+
+    def fast():
+        return rows_response(rows).body
+
+    assert json.loads(default()) == json.loads(fast()), "fast path body differs from the validated one"
+    results = {name: timed(fn, iterations) for name, fn in
+               (("default", default), ("orjson", orjson_path), ("fast", fast))}
+    report(label, results, len(fast()))
+
+
+def report(label: str, results: dict, size: int):
+    base = results["default"]
+    cells = "   ".join(f"{name} {us:8.1f} us ({base / us:4.1f}x)" for name, us in results.items())
+    print(f"{label:<22} {size:7d} B   {cells}")
+
+
+def compare_plan(iterations: int):
+    ai_plan = generated_plan()
+    static_plan = {
+        **{k: ai_plan[k] for k in ("daily_calories", "bmr", "tdee")},
+        "goal": "lose_weight", "diet": "balanced",
+        "meal_plan": generate_meal_plan_by_diet("balanced", "lose_weight"),
+        "workout_routine": generate_workout_plan("moderate", "lose_weight"),
+        "ai_generated": False,
+    }
+    for label, plan in (("generate-plan (AI)", ai_plan), ("generate-plan (static)", static_plan)):
+        # The route has no response_model, so FastAPI's path is jsonable_encoder + render
+        def default():
+            return JSONResponse(jsonable_encoder(plan)).body
+
+        def orjson_path():
+            return FastJSONResponse(jsonable_encoder(plan)).body
+
+        def fast():
+            return dumps(plan)
+
+        assert json.loads(default()) == json.loads(fast())
+
+        results = {name: timed(fn, iterations) for name, fn in
+                   (("default", default), ("orjson", orjson_path), ("fast", fast))}
+        report(label, results, len(fast()))
+
+
+def main(args):
+    engine = seed(args.page)
+    activities, activity_rows = fetch(engine, Activity, ACTIVITY_COLUMNS)
+    meals, meal_rows = fetch(engine, MealAnalysis, MEAL_ANALYSIS_COLUMNS)
+    print(f"page of {args.page}, {args.iterations} iterations; per-response time, speed-up vs default")
+    compare("recent", create_response_field("response", list[ActivityResponse]),
+            activities, activity_rows, args.iterations)
+    compare("meal-insights", create_response_field("response", list[MealAnalysisResponse]),
+            meals, meal_rows, args.iterations)
+    compare_plan(args.iterations)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--page", type=int, default=20)
+    parser.add_argument("--iterations", type=int, default=2000)
+    main(parser.parse_args())
@@ -0,0 +1,100 @@
+# backend/benchmarks/upload_memory.py
+"""Peak memory of the meal-upload pipeline under concurrent uploads.
+
+Runs offline: uploads are spooled the way Starlette spools them and go
+through the real ``Minio.put_object``, with only its HTTP requests replaced
+by sinks, so part buffering is exactly what the SDK does. Compares the old
+read-everything path (``file.read()`` + ``BytesIO`` + temp file for Gemini)
+against the chunked hash + ``put_stream`` path. Files up to one part are
+buffered in full either way; the difference shows above UPLOAD_PART_SIZE.
+
+    python -m benchmarks.upload_memory --size-mb 8 --concurrency 16
+"""
+import argparse
+import hashlib
+import io
+import os
+import tempfile
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+from minio import Minio
+
+from app.storage import UPLOAD_PART_SIZE, hash_fileobj, put_stream
+
+# Starlette's UploadFile spools to disk above 1 MiB
+SPOOL_MAX_SIZE = 1024 * 1024
+
+
+class SinkMinio(Minio):
+    """The real Minio.put_object part splitting, with the HTTP calls replaced by sinks"""
+
+    def __init__(self):
+        super().__init__("localhost:9000", "bench", "bench-secret", secure=False)
+
+    def _put_object(self, bucket_name, object_name, data, headers, query_params=None):
+        return None
+
+    def _create_multipart_upload(self, bucket_name, object_name, headers):
+        return "upload-id"
+
+    def _upload_part(self, bucket_name, object_name, data, headers, upload_id, part_number):
+        return f"etag-{part_number}"
+
+    def _complete_multipart_upload(self, bucket_name, object_name, upload_id, parts):
+        return SimpleNamespace(
+            bucket_name=bucket_name, object_name=object_name, version_id=None,
+            etag="etag", http_headers={}, location=None,
+        )
+
+
+def make_upload(payload: bytes):
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    spool.write(payload)
+    spool.seek(0)
+    return spool
+
+
+def legacy_pipeline(client, spool):
+    content = spool.read()
+    hashlib.sha256(content).hexdigest()
+    client.put_object("bench", "obj", io.BytesIO(content), length=len(content))
+    temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=".jpg")
+    temp_file.write(content)
+    temp_file.close()
+    os.unlink(temp_file.name)
+
+
+def streaming_pipeline(client, spool):
+    hash_fileobj(spool)
+    put_stream(client, "bench", "obj", spool, "image/jpeg")
+
+
+def measure(pipeline, payload: bytes, concurrency: int) -> float:
+    client = SinkMinio()
+    uploads = [make_upload(payload) for _ in range(concurrency)]
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(lambda spool: pipeline(client, spool), uploads))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    for spool in uploads:
+        spool.close()
+    return peak / (1024 * 1024)
+
+
+def main(args):
+    payload = os.urandom(int(args.size_mb * 1024 * 1024))
+    print(f"{args.concurrency} concurrent uploads of {args.size_mb} MiB, part size {UPLOAD_PART_SIZE // (1024 * 1024)} MiB")
+    for name, pipeline in (("legacy", legacy_pipeline), ("streaming", streaming_pipeline)):
+        peak = measure(pipeline, payload, args.concurrency)
+        print(f"{name:>10}: peak {peak:8.1f} MiB ({peak / args.concurrency:6.2f} MiB per upload)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size-mb", type=float, default=8)
+    parser.add_argument("--concurrency", type=int, default=16)
+    main(parser.parse_args())
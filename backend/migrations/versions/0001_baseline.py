@@ -0,0 +1,102 @@
+"""baseline schema
+
+Creates the tables that used to come from Base.metadata.create_all. Tables
+that already exist (databases bootstrapped by create_all) are left alone,
+so existing deployments can simply run ``alembic upgrade head``.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if op.get_context().as_sql:
+        existing = set()
+    else:
+        existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if "users" not in existing:
+        op.create_table(
+            "users",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("email", sa.String(), nullable=False),
+            sa.Column("username", sa.String(), nullable=False),
+            sa.Column("hashed_password", sa.String(), nullable=False),
+            sa.Column("age", sa.Integer(), nullable=True),
+            sa.Column("weight", sa.Integer(), nullable=True),
+            sa.Column("height", sa.Integer(), nullable=True),
+            sa.Column("goal", sa.String(), nullable=True),
+            sa.Column("diet", sa.String(), nullable=True),
+            sa.Column("activity_level", sa.String(), nullable=True),
+            sa.Column("health_conditions", sa.String(), nullable=True),
+            sa.Column("profile_picture", sa.String(), nullable=True),
+        )
+        op.create_index("ix_users_id", "users", ["id"])
+        op.create_index("ix_users_email", "users", ["email"], unique=True)
+        op.create_index("ix_users_username", "users", ["username"], unique=True)
+
+    if "activities" not in existing:
+        op.create_table(
+            "activities",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("activity", sa.String(), nullable=False),
+            sa.Column("duration", sa.Integer(), nullable=False),
+            sa.Column("date", sa.DateTime(), nullable=True),
+            sa.Column("owner_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        )
+        op.create_index("ix_activities_id", "activities", ["id"])
+        op.create_index("ix_activities_activity", "activities", ["activity"])
+
+    if "meal_analyses" not in existing:
+        op.create_table(
+            "meal_analyses",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("image_uri", sa.String(), nullable=True),
+            sa.Column("analysis_data", sa.JSON(), nullable=False),
+            sa.Column("date", sa.DateTime(), nullable=True),
+            sa.Column("owner_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        )
+        op.create_index("ix_meal_analyses_id", "meal_analyses", ["id"])
+
+    if "jobs" not in existing:
+        op.create_table(
+            "jobs",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("kind", sa.String(), nullable=False),
+            sa.Column("payload", sa.JSON(), nullable=False),
+            sa.Column("status", sa.String(), nullable=False),
+            sa.Column("attempts", sa.Integer(), nullable=False),
+            sa.Column("result", sa.JSON(), nullable=True),
+            sa.Column("error", sa.Text(), nullable=True),
+            sa.Column("run_after", sa.DateTime(), nullable=False),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+            sa.Column("updated_at", sa.DateTime(), nullable=True),
+            sa.Column("owner_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        )
+        op.create_index("ix_jobs_id", "jobs", ["id"])
+        op.create_index("ix_jobs_status", "jobs", ["status"])
+
+    if "activity_daily" not in existing:
+        op.create_table(
+            "activity_daily",
+            sa.Column("owner_id", sa.Integer(), sa.ForeignKey("users.id"), primary_key=True),
+            sa.Column("day", sa.Date(), primary_key=True),
+            sa.Column("total_minutes", sa.Integer(), nullable=False),
+            sa.Column("activity_count", sa.Integer(), nullable=False),
+        )
+
+
+def downgrade():
+    op.drop_table("activity_daily")
+    op.drop_table("jobs")
+    op.drop_table("meal_analyses")
+    op.drop_table("activities")
+    op.drop_table("users")
@@ -0,0 +1,43 @@
+"""composite (owner_id, date DESC) indexes for history queries
+
+recent_activities, meal_insights, activity_stats and the wellness score
+all filter on owner_id and sort on date desc; these indexes turn each of
+them into a bounded index range scan instead of a filter + sort.
+
+Built CONCURRENTLY so existing tables stay writable during the upgrade.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_activities_owner_id_date",
+            "activities",
+            ["owner_id", sa.text("date DESC")],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            "ix_meal_analyses_owner_id_date",
+            "meal_analyses",
+            ["owner_id", sa.text("date DESC")],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_meal_analyses_owner_id_date", table_name="meal_analyses", postgresql_concurrently=True)
+        op.drop_index("ix_activities_owner_id_date", table_name="activities", postgresql_concurrently=True)
@@ -0,0 +1,58 @@
+"""extend history indexes with id for keyset pagination
+
+Pages are sought with (date, id) < (cursor_date, cursor_id); adding
+id DESC to the composite index makes that row comparison an index range
+condition, so deep pages cost the same as the first one.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_activities_owner_id_date_id",
+            "activities",
+            ["owner_id", sa.text("date DESC"), sa.text("id DESC")],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            "ix_meal_analyses_owner_id_date_id",
+            "meal_analyses",
+            ["owner_id", sa.text("date DESC"), sa.text("id DESC")],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        # Superseded: the new indexes serve every query the old ones did
+        op.drop_index("ix_activities_owner_id_date", table_name="activities", postgresql_concurrently=True, if_exists=True)
+        op.drop_index("ix_meal_analyses_owner_id_date", table_name="meal_analyses", postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_activities_owner_id_date",
+            "activities",
+            ["owner_id", sa.text("date DESC")],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            "ix_meal_analyses_owner_id_date",
+            "meal_analyses",
+            ["owner_id", sa.text("date DESC")],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index("ix_meal_analyses_owner_id_date_id", table_name="meal_analyses", postgresql_concurrently=True)
+        op.drop_index("ix_activities_owner_id_date_id", table_name="activities", postgresql_concurrently=True)
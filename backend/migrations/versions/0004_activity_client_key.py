@@ -0,0 +1,33 @@
+"""idempotency key for batch-synced activities
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("activities", sa.Column("client_key", sa.String(), nullable=True))
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "uq_activities_owner_id_client_key",
+            "activities",
+            ["owner_id", "client_key"],
+            unique=True,
+            postgresql_where=sa.text("client_key IS NOT NULL"),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index("uq_activities_owner_id_client_key", table_name="activities", postgresql_concurrently=True)
+    op.drop_column("activities", "client_key")
@@ -0,0 +1,28 @@
+"""precomputed wellness scores
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "wellness_scores",
+        sa.Column("owner_id", sa.Integer(), sa.ForeignKey("users.id"), primary_key=True),
+        sa.Column("score", sa.Integer(), nullable=False),
+        sa.Column("profile_complete", sa.Boolean(), nullable=False),
+        sa.Column("recent_activities_count", sa.Integer(), nullable=False),
+        sa.Column("computed_at", sa.DateTime(), nullable=False),
+    )
+
+
+def downgrade():
+    op.drop_table("wellness_scores")
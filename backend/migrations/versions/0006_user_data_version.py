@@ -0,0 +1,24 @@
+"""per-user data version for conditional GETs
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        "users",
+        sa.Column("data_version", sa.BigInteger(), nullable=False, server_default="0"),
+    )
+
+
+def downgrade():
+    op.drop_column("users", "data_version")
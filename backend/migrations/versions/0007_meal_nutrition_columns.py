@@ -0,0 +1,52 @@
+"""typed nutrition columns on meal_analyses
+
+Adds calories/protein_g/carbs_g/fat_g (filled on write; existing rows via
+``python -m app.meal_nutrition backfill``) and rebuilds the history index
+with those columns INCLUDEd so nutrition summaries are index-only scans.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+MACRO_COLUMNS = ("calories", "protein_g", "carbs_g", "fat_g")
+
+
+def upgrade():
+    for name in MACRO_COLUMNS:
+        op.add_column("meal_analyses", sa.Column(name, sa.Float(), nullable=True))
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_meal_analyses_owner_id_date_id_macros",
+            "meal_analyses",
+            ["owner_id", sa.text("date DESC"), sa.text("id DESC")],
+            postgresql_include=list(MACRO_COLUMNS),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index("ix_meal_analyses_owner_id_date_id", table_name="meal_analyses", postgresql_concurrently=True, if_exists=True)
+        op.execute("ALTER INDEX ix_meal_analyses_owner_id_date_id_macros RENAME TO ix_meal_analyses_owner_id_date_id")
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_meal_analyses_owner_id_date_id_plain",
+            "meal_analyses",
+            ["owner_id", sa.text("date DESC"), sa.text("id DESC")],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index("ix_meal_analyses_owner_id_date_id", table_name="meal_analyses", postgresql_concurrently=True, if_exists=True)
+        op.execute("ALTER INDEX ix_meal_analyses_owner_id_date_id_plain RENAME TO ix_meal_analyses_owner_id_date_id")
+
+    for name in reversed(MACRO_COLUMNS):
+        op.drop_column("meal_analyses", name)
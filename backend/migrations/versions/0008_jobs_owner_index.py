@@ -0,0 +1,31 @@
+"""index jobs by owner
+
+The upload dedup lookup and the job status endpoint filter on owner_id;
+without an index both scan the whole queue table as it grows.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_jobs_owner_id_created_at",
+            "jobs",
+            ["owner_id", "created_at"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_jobs_owner_id_created_at", table_name="jobs", postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,27 @@
+"""data version on stored wellness scores
+
+Existing rows start at 0 and are recomputed on their next read once the
+user's data_version has moved past it.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        "wellness_scores",
+        sa.Column("data_version", sa.BigInteger(), nullable=False, server_default="0"),
+    )
+
+
+def downgrade():
+    op.drop_column("wellness_scores", "data_version")
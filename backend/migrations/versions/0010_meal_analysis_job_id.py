@@ -0,0 +1,36 @@
+"""link meal analyses to the upload job that created them
+
+A job reclaimed after its lease expired can run twice; the unique job_id
+lets the second run's insert be skipped instead of duplicating the meal.
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0010"
+down_revision = "0009"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("meal_analyses", sa.Column("job_id", sa.Integer(), sa.ForeignKey("jobs.id"), nullable=True))
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "uq_meal_analyses_job_id",
+            "meal_analyses",
+            ["job_id"],
+            unique=True,
+            postgresql_where=sa.text("job_id IS NOT NULL"),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index("uq_meal_analyses_job_id", table_name="meal_analyses", postgresql_concurrently=True)
+    op.drop_column("meal_analyses", "job_id")
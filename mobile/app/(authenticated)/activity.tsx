@@ -173,7 +173,21 @@ export default function ActivityScreen() {
       const res = await api.post("/upload/", formData, {
         headers: { "Content-Type": "multipart/form-data" },
       });
-      const analysis = res.data?.analysis;
+      // Analysis runs in a background job; poll until it finishes
+      let job = res.data;
+      for (
+        let attempt = 0;
+        attempt < 60 && (job?.status === "pending" || job?.status === "running");
+        attempt++
+      ) {
+        await new Promise((resolve) => setTimeout(resolve, 2000));
+        job = (await api.get(`/upload/jobs/${job.job_id}`)).data;
+      }
+      const analysis =
+        job?.analysis ??
+        (job?.status === "failed"
+          ? { note: job?.error || "AI analysis failed" }
+          : { note: "Analysis is still running, check your insights later" });
       const analysisText =
         typeof analysis === "string"
           ? analysis
@@ -200,7 +214,7 @@ export default function ActivityScreen() {
         setAlert({
           visible: true,
           title: "Analysis Ready",
-          message: "Meal analysis generated.",
+          message: "Meal analysis generated and saved to your insights.",
           type: "success",
         });
       }
@@ -451,35 +465,6 @@ export default function ActivityScreen() {
                 </ThemedText>
                 <ThemedText>Tip: {aiAnalysisObj.suggestion || "—"}</ThemedText>
               </View>
-              <TouchableOpacity
-                style={styles.saveButton}
-                onPress={async () => {
-                  try {
-                    await api.post("/activity/meal-analysis", {
-                      image_uri: imageUri,
-                      analysis: aiAnalysisObj,
-                    });
-                    setAlert({
-                      visible: true,
-                      title: "Saved",
-                      message: "Meal analysis saved to your insights!",
-                      type: "success",
-                    });
-                  } catch (e: any) {
-                    setAlert({
-                      visible: true,
-                      title: "Error",
-                      message: e?.response?.data?.detail || "Failed to save",
-                      type: "error",
-                    });
-                  }
-                }}
-              >
-                <Ionicons name="save-outline" size={18} color="#fff" />
-                <ThemedText style={{ color: "#fff", marginLeft: 6 }}>
-                  Save to Insights
-                </ThemedText>
-              </TouchableOpacity>
             </Animated.View>
           ) : aiAnalysisText ? (
             <View style={styles.analysisBox}>
@@ -696,16 +681,6 @@ const styles = StyleSheet.create({
     borderRadius: 12,
     padding: 12,
   },
-  saveButton: {
-    marginTop: 12,
-    flexDirection: "row",
-    alignItems: "center",
-    justifyContent: "center",
-    backgroundColor: "#38b386",
-    paddingVertical: 10,
-    paddingHorizontal: 16,
-    borderRadius: 8,
-  },
   statsContainer: {
     flexDirection: "row",
     justifyContent: "space-between",